@@ -3,140 +3,343 @@
 Plumbing Estimator - Complete Application
 Multi-tenant construction estimation system with Materials Database
 """
-from flask import Flask, render_template, session, redirect, request
-from flask_cors import CORS
+import gzip
+import hashlib
+import importlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask, render_template, session, request, g
+from jinja2 import FileSystemBytecodeCache
 
 from config import Config
-from database.db import init_db, close_db
-from database.materials_db import init_materials_tables
+from database.db import close_db
+from database.models import get_company_cached
+from middleware.session import FastSessionInterface
+
+try:
+    import brotli
+except ImportError:  # optional - pages are still served gzipped without it
+    brotli = None
+
+# Route blueprints as 'module:attribute', in registration order
+# (order matters where URL rules overlap)
+BLUEPRINTS = (
+    'routes.auth:auth_bp',
+    'routes.admin:admin_bp',
+    'routes.projects:projects_bp',
+    'routes.drawings:drawings_bp',
+    'routes.wbs:wbs_bp',
+    'routes.scales:scales_bp',
+    'routes.materials:materials_bp',
+)
+
+# Full-page templates rendered by the views below
+PAGE_TEMPLATES = (
+    'login.html',
+    'company_select.html',
+    'main.html',
+    'admin.html',
+    'materials.html',
+    'takeoff.html',
+)
+
+# Page templates with no template variables - rendered once, served as bytes
+CONTEXT_FREE_PAGES = (
+    'login.html',
+    'company_select.html',
+    'main.html',
+    'admin.html',
+    'materials.html',
+)
+
+# Templates with no per-request context, pre-rendered for nginx
+STATIC_PAGES = {
+    'login.html': '_login.html',
+}
+
+def _int_args(*names):
+    """Read non-negative integer query args in one pass (None when missing/invalid)"""
+    args = request.args
+    return [int(args[name]) if args.get(name, '').isdigit() else None for name in names]
+
+def file_digest(path):
+    """Short content hash of a file, used to version static asset URLs"""
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+
+def compress_page(body):
+    """Precompressed variants of a rendered page, keyed by Content-Encoding (best first)"""
+    variants = {}
+    if brotli is not None:
+        variants['br'] = brotli.compress(body, quality=11)
+    variants['gzip'] = gzip.compress(body, compresslevel=9)
+    return variants
+
+def print_banner():
+    """Print the startup banner with credentials and access points"""
+    print("\n" + "=" * 70)
+    print(" " * 15 + "PLUMBING ESTIMATOR - COMPLETE SYSTEM")
+    print("=" * 70)
+    print(f"\n🚀 Server starting at http://localhost:{Config.PORT}")
+    print("\n" + "-" * 70)
+    print("DEFAULT CREDENTIALS:")
+    print("-" * 70)
+    print("  Email:    admin@example.com")
+    print("  Password: admin123")
+    print("-" * 70)
+    print("\nFEATURES:")
+    print("  ✓ Multi-tenant company management")
+    print("  ✓ Project & drawing management")
+    print("  ✓ WBS (Work Breakdown Structure)")
+    print("  ✓ Materials database (admin-managed)")
+    print("  ✓ On-screen measurement tools")
+    print("  ✓ Interactive takeoff system")
+    print("  ✓ RFQ generation")
+    print("-" * 70)
+    print("\nACCESS POINTS:")
+    print(f"  Main App:     http://localhost:{Config.PORT}/")
+    print(f"  Admin Panel:  http://localhost:{Config.PORT}/admin")
+    print(f"  Materials DB: http://localhost:{Config.PORT}/materials")
+    print(f"  Takeoff UI:   http://localhost:{Config.PORT}/takeoff")
+    print("-" * 70)
+    print("\nThis is the development server. For production use:")
+    print("  gunicorn -c gunicorn.conf.py wsgi:application")
+    print("-" * 70)
+    print("\n⚠️  Press Ctrl+C to stop the server\n")
+    print("=" * 70 + "\n")
 
-# Import route blueprints
-from routes.auth import auth_bp
-from routes.admin import admin_bp
-from routes.projects import projects_bp
-from routes.drawings import drawings_bp
-from routes.wbs import wbs_bp
-from routes.scales import scales_bp
-from routes.materials import materials_bp
+def init_database():
+    """Create the core and materials tables and the default admin user"""
+    # Setup-only import, kept off the worker boot path
+    from database.db import init_db
+    
+    init_db()
 
-def create_app():
-    """Application factory"""
+def create_app(blueprints=None):
+    """
+    Application factory
+    
+    Args:
+        blueprints: Optional iterable of blueprint names to register
+            (e.g. ('auth', 'projects')). Registers all of them by default.
+    """
     app = Flask(__name__, template_folder='templates')
     
     # Load configuration
     app.config.from_object(Config)
     Config.init_app(app)
     
-    # Enable CORS
-    CORS(app)
+    # Reuse compiled templates instead of re-parsing them in every worker
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory=Config.JINJA_CACHE_DIR)
+    if not Config.DEBUG:
+        app.jinja_env.auto_reload = False
     
-    # Initialize database
-    with app.app_context():
-        init_db()
-        # Initialize materials tables (safe to run multiple times)
-        from database.db import get_db
-        try:
-            init_materials_tables()
-        except Exception as e:
-            print(f"Materials tables already exist: {e}")
+    # Server-side sessions (same `session` API, so views are unchanged)
+    if Config.SESSION_REDIS_URL:
+        import redis
+        from flask_session import Session
+        app.config['SESSION_TYPE'] = 'redis'
+        app.config['SESSION_REDIS'] = redis.from_url(Config.SESSION_REDIS_URL)
+        app.config['SESSION_USE_SIGNER'] = True
+        Session(app)
+    else:
+        app.session_interface = FastSessionInterface()
+    
+    # Enable CORS (wildcard, so a fixed header set is all that's needed;
+    # Flask already answers OPTIONS preflights for every route)
+    @app.after_request
+    def add_cors_headers(response):
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
+        return response
+    
+    # Let the nginx micro-cache (deploy/nginx.conf) hold these static shells
+    # for a few seconds per session cookie; browsers/shared proxies must not
+    @app.after_request
+    def add_private_cache_headers(response):
+        if request.path in ('/admin', '/materials') and response.status_code == 200:
+            response.cache_control.private = True
+            response.cache_control.max_age = 5
+        return response
+    
+    # Page CSS/JS live in static/ under content-versioned URLs, so browsers
+    # can keep them for good and refetch only after an edit
+    asset_versions = {}
+    
+    @app.template_global()
+    def static_url(filename):
+        version = asset_versions.get(filename)
+        if version is None:
+            version = file_digest(os.path.join(app.static_folder, filename))
+            if not app.jinja_env.auto_reload:
+                asset_versions[filename] = version
+        return f"{app.static_url_path}/{filename}?v={version}"
+    
+    @app.after_request
+    def add_static_cache_headers(response):
+        if request.endpoint == 'static' and 'v' in request.args and response.status_code == 200:
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = Config.STATIC_ASSET_MAX_AGE
+            response.cache_control.immutable = True
+        return response
     
     # Register cleanup
     app.teardown_appcontext(close_db)
     
-    # Register blueprints
-    app.register_blueprint(auth_bp)
-    app.register_blueprint(admin_bp)
-    app.register_blueprint(projects_bp)
-    app.register_blueprint(drawings_bp)
-    app.register_blueprint(wbs_bp)
-    app.register_blueprint(scales_bp)
-    app.register_blueprint(materials_bp)  # NEW: Materials routes
+    # Database setup is a one-shot deployment step: `flask --app app init-db`
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create the database schema and default admin user"""
+        init_database()
+    
+    # Context-free pages nginx can serve without touching Python
+    # (deploy/nginx.conf); rerun after editing the templates
+    @app.cli.command('prerender-static')
+    def prerender_static_command():
+        """Render static page templates into the static folder"""
+        os.makedirs(app.static_folder, exist_ok=True)
+        with app.test_request_context():
+            for template_name, filename in STATIC_PAGES.items():
+                with open(os.path.join(app.static_folder, filename), 'w', encoding='utf-8') as f:
+                    f.write(render_template(template_name))
+    
+    # Register blueprints - imported here so routes that aren't requested
+    # (and their PDF/OpenCV dependencies) stay off the import graph. The
+    # modules are imported in parallel, then registered in table order.
+    specs = [spec.split(':') for spec in BLUEPRINTS]
+    specs = [(module_name, attr) for module_name, attr in specs
+             if blueprints is None or module_name.rsplit('.', 1)[1] in blueprints]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        modules = list(executor.map(importlib.import_module, [module_name for module_name, _ in specs]))
+    for (_, attr), module in zip(specs, modules):
+        app.register_blueprint(getattr(module, attr))
     
-    # Main routes
+    # Finish config setup on the first request instead of at worker boot
+    deferred_init_done = False
+    
+    @app.before_request
+    def run_deferred_init():
+        nonlocal deferred_init_done
+        if not deferred_init_done:
+            Config.init_app_deferred(app)
+            deferred_init_done = True
+    
+    # Resolve auth state once per request for the page views below
+    @app.before_request
+    def load_auth_state():
+        g.user_id = session.get('user_id')
+        g.company_id = session.get('company_id')
+        g.company = get_company_cached(g.company_id) if g.company_id else None
+    
+    # Context-free pages are rendered and compressed once, then served from
+    # memory (re-rendered uncompressed each time while templates auto-reload in debug)
+    rendered_pages = {}
+    
+    def load_page(template_name):
+        page = rendered_pages.get(template_name)
+        if page is None:
+            body = render_template(template_name).encode('utf-8')
+            if app.jinja_env.auto_reload:
+                return body, {}
+            page = rendered_pages[template_name] = (body, compress_page(body))
+        return page
+    
+    def render_page(template_name):
+        body, variants = load_page(template_name)
+        accept_encodings = request.accept_encodings
+        for encoding, data in variants.items():
+            if accept_encodings[encoding]:
+                response = app.response_class(data, mimetype='text/html')
+                response.headers['Content-Encoding'] = encoding
+                break
+        else:
+            response = app.response_class(body, mimetype='text/html')
+        response.vary.add('Accept-Encoding')
+        return response
+    
+    # Main routes - hot page views bind g/render_page as default args so
+    # lookups are LOAD_FAST locals (g is a proxy, so it still resolves per request)
     @app.route('/')
-    def index():
+    def index(_g=g, _page=render_page):
         """Main application entry point"""
-        if 'user_id' not in session:
-            return render_template('login.html')
-        
-        if 'company_id' not in session:
-            return render_template('company_select.html')
-        
-        return render_template('main.html')
+        if not _g.user_id:
+            return _page('login.html')
+        return _page('main.html' if _g.company_id else 'company_select.html')
+    
+    @app.route('/public/login')
+    def public_login(_page=render_page):
+        """Login page served without opening the session"""
+        return _page('login.html')
     
     @app.route('/admin')
-    def admin_panel():
+    def admin_panel(_g=g, _page=render_page):
         """Admin panel"""
-        if 'user_id' not in session:
-            return redirect('/')
-        
-        return render_template('admin.html')
+        if not _g.user_id:
+            return _page('login.html'), 401
+        return _page('admin.html')
     
     @app.route('/materials')
-    def materials_manager():
-        """Materials database manager (admin only)"""
-        if 'user_id' not in session:
-            return redirect('/')
-        
-        # Check if user is admin (will be validated by route decorators)
-        return render_template('materials.html')
-    
+    def materials_manager(_g=g, _page=render_page):
+        """Materials database manager (admin only - validated by the API routes)"""
+        if not _g.user_id:
+            return _page('login.html'), 401
+        return _page('materials.html')
     
     @app.route('/takeoff')
-    def takeoff_interface():
+    def takeoff_interface(_g=g, _page=render_page, _render=render_template):
         """Takeoff measurement interface"""
-        if 'user_id' not in session:
-            return redirect('/')
-        
-        if 'company_id' not in session:
-            return redirect('/')
+        # Answer directly instead of bouncing through a redirect to '/'
+        if not _g.user_id:
+            return _page('login.html'), 401
+        if not _g.company_id:
+            return _page('company_select.html')
         
         # Get drawing_id and project_id from query parameters
-        drawing_id = request.args.get('drawing_id', type=int)
-        project_id = request.args.get('project_id', type=int)
-        page_number = request.args.get('page', default=0, type=int)
+        drawing_id, project_id, page_number = _int_args('drawing_id', 'project_id', 'page')
+        page_number = page_number or 0
         
         # If no drawing specified, show selection page
         if not drawing_id:
-            return render_template('select_drawing.html')
+            return _render('select_drawing.html')
         
         # Pass parameters to template
-        return render_template('takeoff.html', 
+        return _render('takeoff.html', 
                             drawing_id=drawing_id, 
                             project_id=project_id,
                             page_number=page_number)    
+    
+    # Pre-warm the page templates so the first request doesn't compile them,
+    # and pre-render the context-free ones
+    for template_name in PAGE_TEMPLATES:
+        app.jinja_env.get_template(template_name)
+    with app.app_context():
+        for template_name in CONTEXT_FREE_PAGES:
+            load_page(template_name)
+    
     return app
 
 if __name__ == '__main__':
+    # Show the app's INFO messages on the dev console (production leaves
+    # logging to the server, where only warnings reach stderr by default)
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(name)s: %(message)s')
+    
     app = create_app()
     
-    print("\n" + "=" * 70)
-    print(" " * 15 + "PLUMBING ESTIMATOR - COMPLETE SYSTEM")
-    print("=" * 70)
-    print(f"\n🚀 Server starting at http://localhost:{Config.PORT}")
-    print("\n" + "-" * 70)
-    print("DEFAULT CREDENTIALS:")
-    print("-" * 70)
-    print("  Email:    admin@example.com")
-    print("  Password: admin123")
-    print("-" * 70)
-    print("\nFEATURES:")
-    print("  ✓ Multi-tenant company management")
-    print("  ✓ Project & drawing management")
-    print("  ✓ WBS (Work Breakdown Structure)")
-    print("  ✓ Materials database (admin-managed)")
-    print("  ✓ On-screen measurement tools")
-    print("  ✓ Interactive takeoff system")
-    print("  ✓ RFQ generation")
-    print("-" * 70)
-    print("\nACCESS POINTS:")
-    print(f"  Main App:     http://localhost:{Config.PORT}/")
-    print(f"  Admin Panel:  http://localhost:{Config.PORT}/admin")
-    print(f"  Materials DB: http://localhost:{Config.PORT}/materials")
-    print(f"  Takeoff UI:   http://localhost:{Config.PORT}/takeoff")
-    print("-" * 70)
-    print("\n⚠️  Press Ctrl+C to stop the server\n")
-    print("=" * 70 + "\n")
+    # The dev server doubles as the setup step so run.bat keeps working
+    with app.app_context():
+        init_database()
+    
+    # Startup banner is opt-in so reloads and piped logs stay quiet
+    if os.environ.get('PLUMBING_BANNER') == '1':
+        print_banner()
+    
+    # The Werkzeug dev server handles one request at a time - development only
+    if not Config.DEBUG:
+        raise SystemExit("FLASK_ENV is not 'development' (set it, or use run.bat); for production run under gunicorn instead: gunicorn -c gunicorn.conf.py wsgi:application")
     
     app.run(
         debug=Config.DEBUG,
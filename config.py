@@ -6,28 +6,70 @@ import os
 class Config:
     # Security
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
+    # Argon2id cost (tuned to keep a login verify well under 100 ms); throwaway
+    # environments such as test runs can lower it through the environment
+    PASSWORD_HASH_TIME_COST = int(os.environ.get('PASSWORD_HASH_TIME_COST', 2))
+    PASSWORD_HASH_MEMORY_COST = int(os.environ.get('PASSWORD_HASH_MEMORY_COST', 65536))  # KiB
+    
+    # Sessions - server-side in Redis when a URL is set, signed cookies otherwise
+    SESSION_REDIS_URL = os.environ.get('SESSION_REDIS_URL')
     
     # File Upload
     UPLOAD_FOLDER = 'uploads'
     MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50MB max file size
     ALLOWED_EXTENSIONS = {'pdf', 'tif', 'tiff'}
+    PAGE_CACHE_FOLDER = 'uploads/cache'  # rendered page PNGs, per drawing/page/DPI
+    # Behind nginx, hand cached page images off via X-Accel-Redirect to this
+    # internal location (deploy/nginx.conf) instead of streaming them from Python
+    PAGE_CACHE_ACCEL_PREFIX = os.environ.get('PAGE_CACHE_ACCEL_PREFIX')
+    # Resolution/format of the page images shown in the browser. Scale zones
+    # and calibrations are stored in these image pixels, so changing the DPI
+    # would misplace existing ones
+    DISPLAY_DPI = 100
+    PREVIEW_FORMAT = 'webp'  # for browsers that accept it, JPEG otherwise
+    # Browser cache lifetime for page images (a drawing's pages never change
+    # and drawing ids are never reused)
+    PAGE_IMAGE_MAX_AGE = 3600
+    # Browser cache lifetime for versioned static assets (static_url in app.py)
+    STATIC_ASSET_MAX_AGE = 31536000
     
     # Database
     DATABASE_PATH = 'data/estimator.db'
+    DB_POOL_SIZE = 8  # idle connections kept per worker process
+    # Prepared statements kept per connection (sqlite3 defaults to 128; the
+    # app issues more distinct SQL strings than that)
+    DB_STATEMENT_CACHE_SIZE = 256
+    # Seconds a worker reuses a looked-up session user/company; changes made
+    # through another worker process show up after at most this long
+    LOOKUP_CACHE_TTL = 5
+    
+    # Compiled Jinja templates, shared across workers and restarts
+    JINJA_CACHE_DIR = 'data/jinja_cache'
     
     # Application
-    DEBUG = True
+    # Debug (template auto-reload, dev server) only when FLASK_ENV is
+    # explicitly 'development' (run.bat sets it); any other entry point
+    # (gunicorn, flask run, another WSGI server) runs as production
+    DEBUG = os.environ.get('FLASK_ENV', 'production') == 'development'
+    # In production nginx (deploy/nginx.conf) terminates TLS/HTTP/2 and proxies
+    # to this port over keep-alive connections
     HOST = '0.0.0.0'
     PORT = 5000
     
     # Detection Settings
-    PDF_DPI = 150  # DPI for PDF to image conversion
+    DETECTION_DPI = 150  # DPI pages are rendered at for detection (item coordinates use it)
     DETECTION_MIN_RADIUS = 10
     DETECTION_MAX_RADIUS = 50
+    DETECTION_MIN_EDGE_DENSITY = 0.0005  # skip pages with fewer edge pixels (blank sheets)
     
     @staticmethod
     def init_app(app):
-        """Initialize application with this config"""
-        # Create necessary directories
+        """Initialize what the app factory itself needs (runs on every worker boot)"""
+        # Template pre-warming writes here; also creates data/ for the database
+        os.makedirs(Config.JINJA_CACHE_DIR, exist_ok=True)
+    
+    @staticmethod
+    def init_app_deferred(app):
+        """One-time setup that can wait until the first request"""
         os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
-        os.makedirs('data', exist_ok=True)
\ No newline at end of file
+        os.makedirs(Config.PAGE_CACHE_FOLDER, exist_ok=True)
\ No newline at end of file
@@ -1,55 +1,57 @@
 """
 Database package initialization - UPDATED with Materials
+
+Names are imported from their submodule on first access (PEP 562), so a
+worker that only needs, say, the models never loads materials_db.
 """
-from .db import get_db, init_db, close_db, load_default_materials_for_company
-from .models import (
-    create_company, get_companies, delete_company, get_company,
-    create_user, get_users, get_user_by_email, get_user_by_id, delete_user,
-    add_user_to_company, get_user_companies, check_user_company_access,
-    create_project, get_projects_by_company, get_project, update_project, delete_project,
-    create_drawing, get_drawings_by_project, get_drawing, update_drawing, delete_drawing, update_drawing_scale,
-    create_detected_item, get_detected_items, update_detected_item, delete_detected_item,
-    get_takeoff_summary,
-    create_default_wbs_categories, get_wbs_categories, get_wbs_category, get_wbs_categories_tree,
-    create_wbs_category, update_wbs_category, delete_wbs_category, get_wbs_path,
-    get_takeoff_by_wbs, get_takeoff_by_wbs_for_drawing,
-    update_detected_item_wbs, bulk_update_items_wbs,
-    check_wbs_category_has_items, check_wbs_category_has_children,
-    create_custom_scale, get_custom_scales_for_project, delete_custom_scale,
-    set_page_scale, get_page_scale,
-    create_scale_zone, get_scale_zones_for_page, update_scale_zone, delete_scale_zone,
-    get_project_from_drawing
-)
-from .materials_db import (
-    init_materials_tables,
-    get_company_materials, get_material, create_material, update_material, delete_material,
-    create_takeoff_item, get_takeoff_items, update_takeoff_item, delete_takeoff_item,
-    get_project_takeoff_summary,
-    create_rfq, add_rfq_item, get_project_rfqs, get_rfq_with_items, update_rfq_status
-)
+import importlib
+
+# Public names, by the submodule that defines them
+_EXPORTS = {
+    '.db': (
+        'get_db', 'write_tx', 'init_db', 'close_db', 'load_default_materials_for_company',
+        'set_schema_version', 'MATERIALS_SCHEMA_VERSION',
+        'hash_password', 'verify_password', 'password_needs_rehash',
+    ),
+    '.models': (
+        'create_company', 'get_companies', 'count_companies', 'delete_company', 'get_company', 'get_company_cached',
+        'create_user', 'update_user_password', 'get_users', 'count_users', 'get_user_by_email', 'get_user_by_id', 'get_user_cached', 'delete_user',
+        'add_user_to_company', 'get_user_companies', 'check_user_company_access',
+        'create_project', 'get_projects_by_company', 'get_project', 'update_project', 'delete_project',
+        'create_drawing', 'get_drawings_by_project', 'get_drawings_with_counts_by_project', 'get_project_bundle',
+        'get_drawing', 'drawing_exists', 'update_drawing', 'delete_drawing', 'update_drawing_scale',
+        'get_page_count_for_file',
+        'create_detected_item', 'save_detection_results', 'bulk_create_detected_items', 'get_detected_items', 'get_detected_item_boxes', 'update_detected_item', 'delete_detected_item',
+        'get_takeoff_summary',
+        'create_default_wbs_categories', 'get_wbs_categories', 'get_wbs_category', 'get_wbs_categories_tree',
+        'create_wbs_category', 'update_wbs_category', 'delete_wbs_category', 'get_wbs_path',
+        'get_takeoff_by_wbs', 'get_takeoff_by_wbs_for_drawing',
+        'update_detected_item_wbs', 'bulk_update_items_wbs',
+        'check_wbs_category_has_items', 'check_wbs_category_has_children',
+        'create_custom_scale', 'get_custom_scales_for_project', 'delete_custom_scale',
+        'set_page_scale', 'get_page_scale',
+        'create_scale_zone', 'get_scale_zones_for_page', 'update_scale_zone', 'delete_scale_zone',
+        'get_project_from_drawing',
+    ),
+    '.materials_db': (
+        'get_company_materials', 'get_company_material_categories', 'get_material', 'create_material', 'update_material', 'delete_material',
+        'create_takeoff_item', 'bulk_create_takeoff_items', 'get_takeoff_items', 'update_takeoff_item', 'delete_takeoff_item',
+        'get_project_takeoff_summary',
+        'create_rfq', 'add_rfq_item', 'add_rfq_items', 'get_project_rfqs', 'get_rfq_with_items', 'update_rfq_status',
+    ),
+}
+
+_LAZY = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_LAZY)
+
+def __getattr__(name):
+    """Import an exported name from its submodule on first access"""
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
 
-__all__ = [
-    'get_db', 'init_db', 'close_db', 'load_default_materials_for_company',
-    'create_company', 'get_companies', 'delete_company', 'get_company',
-    'create_user', 'get_users', 'get_user_by_email', 'get_user_by_id', 'delete_user',
-    'add_user_to_company', 'get_user_companies', 'check_user_company_access',
-    'create_project', 'get_projects_by_company', 'get_project', 'update_project', 'delete_project',
-    'create_drawing', 'get_drawings_by_project', 'get_drawing', 'update_drawing', 'delete_drawing', 'update_drawing_scale',
-    'create_detected_item', 'get_detected_items', 'update_detected_item', 'delete_detected_item',
-    'get_takeoff_summary',
-    'create_default_wbs_categories', 'get_wbs_categories', 'get_wbs_category', 'get_wbs_categories_tree',
-    'create_wbs_category', 'update_wbs_category', 'delete_wbs_category', 'get_wbs_path',
-    'get_takeoff_by_wbs', 'get_takeoff_by_wbs_for_drawing',
-    'update_detected_item_wbs', 'bulk_update_items_wbs',
-    'check_wbs_category_has_items', 'check_wbs_category_has_children',
-    'create_custom_scale', 'get_custom_scales_for_project', 'delete_custom_scale',
-    'set_page_scale', 'get_page_scale',
-    'create_scale_zone', 'get_scale_zones_for_page', 'update_scale_zone', 'delete_scale_zone',
-    'get_project_from_drawing',
-    # Materials database exports
-    'init_materials_tables',
-    'get_company_materials', 'get_material', 'create_material', 'update_material', 'delete_material',
-    'create_takeoff_item', 'get_takeoff_items', 'update_takeoff_item', 'delete_takeoff_item',
-    'get_project_takeoff_summary',
-    'create_rfq', 'add_rfq_item', 'get_project_rfqs', 'get_rfq_with_items', 'update_rfq_status'
-]
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
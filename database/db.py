@@ -2,290 +2,663 @@
 """
 Database connection and initialization with Materials Database
 """
+import logging
+import os
+import queue
 import sqlite3
+import time
+from contextlib import contextmanager
+from functools import wraps
+from itertools import chain
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 from flask import g
-from werkzeug.security import generate_password_hash
+from werkzeug.security import check_password_hash
 from config import Config
 
-def get_db():
-    """Get database connection"""
-    if 'db' not in g:
-        g.db = sqlite3.connect(Config.DATABASE_PATH)
-        g.db.row_factory = sqlite3.Row
-    return g.db
+logger = logging.getLogger(__name__)
 
-def close_db(e=None):
-    """Close database connection"""
-    db = g.pop('db', None)
-    if db is not None:
-        db.close()
+# Stamped into PRAGMA user_version by init_db (for inspecting a database
+# file - init_db itself is idempotent and always runs in full); bump
+# whenever SCHEMA_DDL changes
+MATERIALS_SCHEMA_VERSION = 1
 
-def init_db():
-    """Initialize database with complete schema including materials"""
-    conn = sqlite3.connect(Config.DATABASE_PATH)
-    c = conn.cursor()
-    
-    print("=" * 60)
-    print("Initializing Database Schema...")
-    print("=" * 60)
-    
-    # ============ Core Tables ============
-    
-    # Companies table
-    c.execute('''CREATE TABLE IF NOT EXISTS companies (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL UNIQUE,
-        address TEXT,
-        phone TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )''')
-    print("✓ Companies table")
-    
-    # Users table
-    c.execute('''CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        email TEXT NOT NULL UNIQUE,
-        password_hash TEXT NOT NULL,
-        first_name TEXT,
-        last_name TEXT,
-        is_admin BOOLEAN DEFAULT 0,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )''')
-    print("✓ Users table")
-    
-    # User-Company relationship
-    c.execute('''CREATE TABLE IF NOT EXISTS user_companies (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        company_id INTEGER NOT NULL,
-        role TEXT DEFAULT 'user',
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-        FOREIGN KEY (company_id) REFERENCES companies(id) ON DELETE CASCADE,
-        UNIQUE(user_id, company_id)
-    )''')
-    print("✓ User-Companies relationship table")
-    
-    # Projects table
-    c.execute('''CREATE TABLE IF NOT EXISTS projects (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        company_id INTEGER NOT NULL,
-        name TEXT NOT NULL,
-        description TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (company_id) REFERENCES companies(id) ON DELETE CASCADE
-    )''')
-    print("✓ Projects table")
+# Argon2id (cost from Config). Stored hashes carry their own parameters, and
+# ones made with other settings are upgraded on the next login
+password_hasher = PasswordHasher(
+    time_cost=Config.PASSWORD_HASH_TIME_COST,
+    memory_cost=Config.PASSWORD_HASH_MEMORY_COST,
+    parallelism=2
+)
+
+# Applied once to every pooled connection. foreign_keys stays off: the
+# schema's ON DELETE rules have never been enforced, and turning them on
+# would make admin reset-materials fail on referenced takeoff/RFQ rows.
+CONNECTION_PRAGMAS = (
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA busy_timeout = 5000',
+    'PRAGMA cache_size = -20000',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA mmap_size = 268435456',
+)
+
+def ttl_cache(seconds, maxsize=1024):
+    """
+    Memoize a one-argument lookup in process memory for `seconds`
     
-    # WBS Categories table
-    c.execute('''CREATE TABLE IF NOT EXISTS wbs_categories (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        project_id INTEGER NOT NULL,
-        parent_id INTEGER,
-        name TEXT NOT NULL,
-        sort_order INTEGER DEFAULT 0,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE,
-        FOREIGN KEY (parent_id) REFERENCES wbs_categories(id) ON DELETE CASCADE
-    )''')
-    print("✓ WBS Categories table")
+    For hot lookups (the session's user and company) that must not hit the
+    database on every request. Writes in this process call cache_clear();
+    other worker processes see a change once their entry expires.
+    """
+    def decorator(f):
+        cache = {}
+        
+        @wraps(f)
+        def wrapper(key):
+            now = time.monotonic()
+            hit = cache.get(key)
+            if hit is not None and hit[0] > now:
+                return hit[1]
+            value = f(key)
+            if len(cache) >= maxsize:
+                cache.clear()
+            cache[key] = (now + seconds, value)
+            return value
+        
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
+class ConnectionPool:
+    """
+    Reusable SQLite connections shared across requests
     
-    # Drawings table
-    c.execute('''CREATE TABLE IF NOT EXISTS drawings (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        project_id INTEGER NOT NULL,
-        name TEXT NOT NULL,
-        file_path TEXT NOT NULL,
-        page_count INTEGER,
-        scale TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
-    )''')
-    print("✓ Drawings table")
+    Connections are opened on demand and kept (up to `size` idle ones) for
+    the next request instead of reopening the database file every time.
+    Idle connections inherited across a fork are discarded, so the pool is
+    safe to create before gunicorn forks its workers.
     
-    # Custom Scales table
-    c.execute('''CREATE TABLE IF NOT EXISTS custom_scales (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        project_id INTEGER NOT NULL,
-        name TEXT NOT NULL,
-        pixels_per_unit REAL NOT NULL,
-        unit TEXT DEFAULT 'feet',
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
-    )''')
-    print("✓ Custom Scales table")
+    Pooled connections live for the whole worker, so instead of on close
+    PRAGMA optimize (refreshes planner statistics where they have gone
+    stale; usually a no-op) runs every `optimize_every` releases and
+    whenever the pool closes a connection.
+    """
     
-    # Page Scales table
-    c.execute('''CREATE TABLE IF NOT EXISTS page_scales (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        drawing_id INTEGER NOT NULL,
-        page_number INTEGER NOT NULL,
-        scale_id TEXT,
-        scale_name TEXT,
-        pixels_per_unit REAL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (drawing_id) REFERENCES drawings(id) ON DELETE CASCADE,
-        UNIQUE(drawing_id, page_number)
-    )''')
-    print("✓ Page Scales table")
+    def __init__(self, database, size, optimize_every=1000):
+        self.database = database
+        self.size = size
+        self.optimize_every = optimize_every
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._pid = os.getpid()
+        self._releases = 0
     
-    # Scale Zones table
-    c.execute('''CREATE TABLE IF NOT EXISTS scale_zones (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        drawing_id INTEGER NOT NULL,
-        page_number INTEGER NOT NULL,
-        name TEXT NOT NULL,
-        x REAL NOT NULL,
-        y REAL NOT NULL,
-        width REAL NOT NULL,
-        height REAL NOT NULL,
-        scale_id TEXT,
-        scale_name TEXT,
-        pixels_per_unit REAL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (drawing_id) REFERENCES drawings(id) ON DELETE CASCADE
-    )''')
-    print("✓ Scale Zones table")
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.database, check_same_thread=False,
+            cached_statements=Config.DB_STATEMENT_CACHE_SIZE
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
     
-    # Detected items table (legacy - for auto-detection)
-    c.execute('''CREATE TABLE IF NOT EXISTS detected_items (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        drawing_id INTEGER NOT NULL,
-        page_number INTEGER NOT NULL,
-        item_type TEXT NOT NULL,
-        x REAL,
-        y REAL,
-        width REAL,
-        height REAL,
-        confidence REAL,
-        verified BOOLEAN DEFAULT 0,
-        notes TEXT,
-        wbs_category_id INTEGER,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (drawing_id) REFERENCES drawings(id) ON DELETE CASCADE,
-        FOREIGN KEY (wbs_category_id) REFERENCES wbs_categories(id)
-    )''')
-    print("✓ Detected Items table")
+    def acquire(self):
+        """Check out a connection, opening a new one if none are idle"""
+        if self._pid != os.getpid():
+            self.reset()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
     
-    # ============ Materials Database Tables ============
+    def _close(self, conn):
+        conn.execute('PRAGMA optimize')
+        conn.close()
     
-    # Company Materials table
-    c.execute('''CREATE TABLE IF NOT EXISTS company_materials (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        company_id INTEGER NOT NULL,
-        part_number TEXT NOT NULL,
-        category TEXT NOT NULL,
-        description TEXT NOT NULL,
-        size TEXT,
-        unit TEXT NOT NULL,
-        list_price REAL NOT NULL,
-        labor_units REAL NOT NULL,
-        is_active BOOLEAN DEFAULT 1,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (company_id) REFERENCES companies(id) ON DELETE CASCADE,
-        UNIQUE(company_id, part_number)
-    )''')
-    print("✓ Company Materials table")
+    def release(self, conn):
+        """Return a connection to the pool (or close it if the pool is full)"""
+        if conn.in_transaction:
+            conn.rollback()
+        self._releases += 1
+        if self._releases % self.optimize_every == 0:
+            conn.execute('PRAGMA optimize')
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            self._close(conn)
     
-    # Material Takeoff Items table
-    c.execute('''CREATE TABLE IF NOT EXISTS takeoff_items (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        drawing_id INTEGER NOT NULL,
-        page_number INTEGER NOT NULL,
-        material_id INTEGER NOT NULL,
-        wbs_category_id INTEGER,
-        quantity REAL NOT NULL,
-        multiplier REAL DEFAULT 1.0,
-        measurement_type TEXT,
-        notes TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (drawing_id) REFERENCES drawings(id) ON DELETE CASCADE,
-        FOREIGN KEY (material_id) REFERENCES company_materials(id),
-        FOREIGN KEY (wbs_category_id) REFERENCES wbs_categories(id)
-    )''')
-    print("✓ Takeoff Items table")
+    def reset(self):
+        """Drop all idle connections (e.g. after forking)"""
+        inherited = self._pid != os.getpid()
+        self._pid = os.getpid()
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            # Never close a connection a parent process is still using
+            if not inherited:
+                self._close(conn)
+
+pool = ConnectionPool(Config.DATABASE_PATH, Config.DB_POOL_SIZE)
+
+def get_db(raw=False):
+    """
+    Get database connection (checked out from the pool for this request)
+
+    raw=True returns a cursor on it that yields plain tuples instead of
+    sqlite3.Row - cheaper for large result sets read by position.
+    """
+    if 'db' not in g:
+        g.db = pool.acquire()
+    if raw:
+        cursor = g.db.cursor()
+        cursor.row_factory = None
+        return cursor
+    return g.db
+
+@contextmanager
+def write_tx():
+    """
+    Run a block of writes in one BEGIN IMMEDIATE transaction
     
-    # RFQs table
-    c.execute('''CREATE TABLE IF NOT EXISTS rfqs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        project_id INTEGER NOT NULL,
-        rfq_number TEXT NOT NULL,
-        supplier_name TEXT,
-        supplier_email TEXT,
-        supplier_phone TEXT,
-        status TEXT DEFAULT 'draft',
-        notes TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        sent_at TIMESTAMP,
-        FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE,
-        UNIQUE(project_id, rfq_number)
-    )''')
-    print("✓ RFQs table")
+    The write lock is taken up front (waiting up to busy_timeout), so reads
+    inside the block can't be invalidated and the upgrade to a writer can't
+    fail with SQLITE_BUSY halfway through. Commits on success, rolls back on
+    error; reads outside a block stay in autocommit. Bulk loaders use it
+    so their inserts always share one explicit transaction.
     
-    # RFQ Items table
-    c.execute('''CREATE TABLE IF NOT EXISTS rfq_items (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        rfq_id INTEGER NOT NULL,
-        material_id INTEGER NOT NULL,
-        quantity REAL NOT NULL,
-        unit TEXT NOT NULL,
-        notes TEXT,
-        FOREIGN KEY (rfq_id) REFERENCES rfqs(id) ON DELETE CASCADE,
-        FOREIGN KEY (material_id) REFERENCES company_materials(id)
-    )''')
-    print("✓ RFQ Items table")
+    Blocks don't nest: opening one while the connection has uncommitted
+    writes raises RuntimeError rather than committing them on the
+    caller's behalf.
+    """
+    db = get_db()
+    if db.in_transaction:
+        raise RuntimeError('write_tx opened inside a pending transaction')
+    db.execute('BEGIN IMMEDIATE')
+    try:
+        yield db
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+
+# Bound parameters per statement on SQLite builds older than 3.32
+SQLITE_MAX_VARIABLES = 999
+
+def insert_rows(db, table, columns, rows):
+    """
+    Insert rows with multi-row INSERT ... VALUES statements
     
-    # ============ Create Default Admin User ============
+    Each statement carries as many rows as fit under SQLITE_MAX_VARIABLES,
+    so SQLite parses a few large statements instead of running one per row.
+    table and columns are trusted names, never user input.
     
-    admin_exists = c.execute('SELECT COUNT(*) FROM users WHERE is_admin = 1').fetchone()[0]
-    if admin_exists == 0:
-        admin_hash = generate_password_hash('admin123')
-        c.execute(
-            'INSERT INTO users (email, password_hash, first_name, last_name, is_admin) VALUES (?, ?, ?, ?, ?)',
-            ('admin@example.com', admin_hash, 'Admin', 'User', 1)
+    Returns:
+        int: Number of rows inserted
+    """
+    rows = list(rows)
+    placeholder = '(' + ', '.join('?' * len(columns)) + ')'
+    chunk_size = SQLITE_MAX_VARIABLES // len(columns)
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        db.execute(
+            f'INSERT INTO {table} ({", ".join(columns)}) VALUES ' + ', '.join([placeholder] * len(chunk)),
+            list(chain.from_iterable(chunk))
         )
-        print("✓ Default admin user created")
-        print("  Email: admin@example.com")
-        print("  Password: admin123")
+    return len(rows)
+
+def close_db(e=None):
+    """Return the request's database connection to the pool"""
+    db = g.pop('db', None)
+    if db is not None:
+        pool.release(db)
+
+def hash_password(password):
+    """Hash a password for storage"""
+    return password_hasher.hash(password)
+
+def verify_password(password_hash, password):
+    """Check a password against a stored hash (argon2, or a legacy Werkzeug hash)"""
+    if not password_hash.startswith('$argon2'):
+        return check_password_hash(password_hash, password)
+    try:
+        return password_hasher.verify(password_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+def password_needs_rehash(password_hash):
+    """True for legacy Werkzeug hashes and argon2 hashes with outdated parameters"""
+    return (not password_hash.startswith('$argon2')
+            or password_hasher.check_needs_rehash(password_hash))
+
+def set_schema_version(db, version):
+    """Record the installed schema version (PRAGMA does not accept parameters)"""
+    db.execute(f'PRAGMA user_version = {int(version)}')
+
+# Tables, run by init_db as a single script
+SCHEMA_DDL = '''
+-- ============ Core Tables ============
+
+-- Companies table
+CREATE TABLE IF NOT EXISTS companies (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    address TEXT,
+    phone TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Users table
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT NOT NULL UNIQUE,
+    password_hash TEXT NOT NULL,
+    first_name TEXT,
+    last_name TEXT,
+    is_admin BOOLEAN DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- User-Company relationship
+CREATE TABLE IF NOT EXISTS user_companies (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    company_id INTEGER NOT NULL,
+    role TEXT DEFAULT 'user',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (company_id) REFERENCES companies(id) ON DELETE CASCADE,
+    UNIQUE(user_id, company_id)
+);
+
+-- Projects table
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    company_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (company_id) REFERENCES companies(id) ON DELETE CASCADE
+);
+
+-- WBS Categories table
+CREATE TABLE IF NOT EXISTS wbs_categories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_id INTEGER NOT NULL,
+    parent_id INTEGER,
+    name TEXT NOT NULL,
+    sort_order INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE,
+    FOREIGN KEY (parent_id) REFERENCES wbs_categories(id) ON DELETE CASCADE
+);
+
+-- Drawings table
+CREATE TABLE IF NOT EXISTS drawings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    page_count INTEGER,
+    scale TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
+);
+
+-- Custom Scales table
+CREATE TABLE IF NOT EXISTS custom_scales (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    pixels_per_unit REAL NOT NULL,
+    unit TEXT DEFAULT 'feet',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE
+);
+
+-- Page Scales table
+CREATE TABLE IF NOT EXISTS page_scales (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    drawing_id INTEGER NOT NULL,
+    page_number INTEGER NOT NULL,
+    scale_id TEXT,
+    scale_name TEXT,
+    pixels_per_unit REAL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (drawing_id) REFERENCES drawings(id) ON DELETE CASCADE,
+    UNIQUE(drawing_id, page_number)
+);
+
+-- Scale Zones table
+CREATE TABLE IF NOT EXISTS scale_zones (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    drawing_id INTEGER NOT NULL,
+    page_number INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    x REAL NOT NULL,
+    y REAL NOT NULL,
+    width REAL NOT NULL,
+    height REAL NOT NULL,
+    scale_id TEXT,
+    scale_name TEXT,
+    pixels_per_unit REAL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (drawing_id) REFERENCES drawings(id) ON DELETE CASCADE
+);
+
+-- Detected items table (legacy - for auto-detection)
+CREATE TABLE IF NOT EXISTS detected_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    drawing_id INTEGER NOT NULL,
+    page_number INTEGER NOT NULL,
+    item_type TEXT NOT NULL,
+    x REAL,
+    y REAL,
+    width REAL,
+    height REAL,
+    confidence REAL,
+    verified BOOLEAN DEFAULT 0,
+    notes TEXT,
+    wbs_category_id INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (drawing_id) REFERENCES drawings(id) ON DELETE CASCADE,
+    FOREIGN KEY (wbs_category_id) REFERENCES wbs_categories(id)
+);
+
+-- ============ Materials Database Tables ============
+
+-- Default materials catalog (database/default_materials.csv, refreshed by
+-- init_db); new companies get a copy with one INSERT ... SELECT
+CREATE TABLE IF NOT EXISTS default_materials (
+    part_number TEXT NOT NULL,
+    category TEXT NOT NULL,
+    description TEXT NOT NULL,
+    size TEXT,
+    unit TEXT NOT NULL,
+    list_price REAL NOT NULL,
+    labor_units REAL NOT NULL
+);
+
+-- Company Materials table
+CREATE TABLE IF NOT EXISTS company_materials (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    company_id INTEGER NOT NULL,
+    part_number TEXT NOT NULL,
+    category TEXT NOT NULL,
+    description TEXT NOT NULL,
+    size TEXT,
+    unit TEXT NOT NULL,
+    list_price REAL NOT NULL,
+    labor_units REAL NOT NULL,
+    is_active BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (company_id) REFERENCES companies(id) ON DELETE CASCADE,
+    UNIQUE(company_id, part_number)
+);
+
+-- Material Takeoff Items table
+CREATE TABLE IF NOT EXISTS takeoff_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    drawing_id INTEGER NOT NULL,
+    page_number INTEGER NOT NULL,
+    material_id INTEGER NOT NULL,
+    wbs_category_id INTEGER,
+    quantity REAL NOT NULL,
+    multiplier REAL DEFAULT 1.0,
+    measurement_type TEXT,
+    notes TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (drawing_id) REFERENCES drawings(id) ON DELETE CASCADE,
+    FOREIGN KEY (material_id) REFERENCES company_materials(id),
+    FOREIGN KEY (wbs_category_id) REFERENCES wbs_categories(id)
+);
+
+-- RFQs table
+CREATE TABLE IF NOT EXISTS rfqs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_id INTEGER NOT NULL,
+    rfq_number TEXT NOT NULL,
+    supplier_name TEXT,
+    supplier_email TEXT,
+    supplier_phone TEXT,
+    status TEXT DEFAULT 'draft',
+    notes TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    sent_at TIMESTAMP,
+    FOREIGN KEY (project_id) REFERENCES projects(id) ON DELETE CASCADE,
+    UNIQUE(project_id, rfq_number)
+);
+
+-- RFQ Items table
+CREATE TABLE IF NOT EXISTS rfq_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    rfq_id INTEGER NOT NULL,
+    material_id INTEGER NOT NULL,
+    quantity REAL NOT NULL,
+    unit TEXT NOT NULL,
+    notes TEXT,
+    FOREIGN KEY (rfq_id) REFERENCES rfqs(id) ON DELETE CASCADE,
+    FOREIGN KEY (material_id) REFERENCES company_materials(id)
+);
+
+-- ============ Takeoff Rollup ============
+
+-- Running takeoff totals per project, WBS category (0 = none) and material,
+-- kept by the triggers below and read by get_project_takeoff_summary.
+-- Prices and labor are applied at read time: SUM(q * m * price) is
+-- price * SUM(q * m), and labor uses the quantity without the multiplier
+CREATE TABLE IF NOT EXISTS takeoff_rollup (
+    project_id INTEGER NOT NULL,
+    wbs_category_id INTEGER NOT NULL,
+    material_id INTEGER NOT NULL,
+    item_count INTEGER NOT NULL,
+    total_quantity REAL NOT NULL,  -- SUM(quantity * multiplier)
+    base_quantity REAL NOT NULL,   -- SUM(quantity)
+    PRIMARY KEY (project_id, wbs_category_id, material_id)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS takeoff_rollup_insert AFTER INSERT ON takeoff_items
+BEGIN
+    INSERT INTO takeoff_rollup
+    SELECT project_id, IFNULL(NEW.wbs_category_id, 0), NEW.material_id, 1,
+           IFNULL(NEW.quantity * NEW.multiplier, 0), IFNULL(NEW.quantity, 0)
+    FROM drawings WHERE id = NEW.drawing_id
+    ON CONFLICT (project_id, wbs_category_id, material_id) DO UPDATE SET
+        item_count = item_count + 1,
+        total_quantity = total_quantity + excluded.total_quantity,
+        base_quantity = base_quantity + excluded.base_quantity;
+END;
+
+CREATE TRIGGER IF NOT EXISTS takeoff_rollup_delete AFTER DELETE ON takeoff_items
+BEGIN
+    UPDATE takeoff_rollup SET
+        item_count = item_count - 1,
+        total_quantity = total_quantity - IFNULL(OLD.quantity * OLD.multiplier, 0),
+        base_quantity = base_quantity - IFNULL(OLD.quantity, 0)
+    WHERE project_id = (SELECT project_id FROM drawings WHERE id = OLD.drawing_id)
+      AND wbs_category_id = IFNULL(OLD.wbs_category_id, 0) AND material_id = OLD.material_id;
+    DELETE FROM takeoff_rollup
+    WHERE project_id = (SELECT project_id FROM drawings WHERE id = OLD.drawing_id)
+      AND wbs_category_id = IFNULL(OLD.wbs_category_id, 0) AND material_id = OLD.material_id
+      AND item_count = 0;
+END;
+
+-- An update moves the item out of its old group and into its new one
+CREATE TRIGGER IF NOT EXISTS takeoff_rollup_update
+AFTER UPDATE OF drawing_id, material_id, wbs_category_id, quantity, multiplier ON takeoff_items
+BEGIN
+    UPDATE takeoff_rollup SET
+        item_count = item_count - 1,
+        total_quantity = total_quantity - IFNULL(OLD.quantity * OLD.multiplier, 0),
+        base_quantity = base_quantity - IFNULL(OLD.quantity, 0)
+    WHERE project_id = (SELECT project_id FROM drawings WHERE id = OLD.drawing_id)
+      AND wbs_category_id = IFNULL(OLD.wbs_category_id, 0) AND material_id = OLD.material_id;
+    DELETE FROM takeoff_rollup
+    WHERE project_id = (SELECT project_id FROM drawings WHERE id = OLD.drawing_id)
+      AND wbs_category_id = IFNULL(OLD.wbs_category_id, 0) AND material_id = OLD.material_id
+      AND item_count = 0;
+    INSERT INTO takeoff_rollup
+    SELECT project_id, IFNULL(NEW.wbs_category_id, 0), NEW.material_id, 1,
+           IFNULL(NEW.quantity * NEW.multiplier, 0), IFNULL(NEW.quantity, 0)
+    FROM drawings WHERE id = NEW.drawing_id
+    ON CONFLICT (project_id, wbs_category_id, material_id) DO UPDATE SET
+        item_count = item_count + 1,
+        total_quantity = total_quantity + excluded.total_quantity,
+        base_quantity = base_quantity + excluded.base_quantity;
+END;
+
+-- Deleting a drawing leaves its takeoff items behind (foreign keys are
+-- off) but drops them from the summary, so recount the project
+CREATE TRIGGER IF NOT EXISTS takeoff_rollup_drawing_delete AFTER DELETE ON drawings
+BEGIN
+    DELETE FROM takeoff_rollup WHERE project_id = OLD.project_id;
+    INSERT INTO takeoff_rollup
+    SELECT d.project_id, IFNULL(ti.wbs_category_id, 0), ti.material_id, COUNT(*),
+           TOTAL(ti.quantity * ti.multiplier), TOTAL(ti.quantity)
+    FROM takeoff_items ti JOIN drawings d ON ti.drawing_id = d.id
+    WHERE d.project_id = OLD.project_id
+    GROUP BY 1, 2, 3;
+END;
+'''
+
+# Recomputes takeoff_rollup from scratch (init_db; also clears any float
+# drift from the running sums)
+REBUILD_TAKEOFF_ROLLUP_SQL = '''
+    INSERT INTO takeoff_rollup
+    SELECT d.project_id, IFNULL(ti.wbs_category_id, 0), ti.material_id, COUNT(*),
+           TOTAL(ti.quantity * ti.multiplier), TOTAL(ti.quantity)
+    FROM takeoff_items ti JOIN drawings d ON ti.drawing_id = d.id
+    GROUP BY 1, 2, 3
+'''
+
+# Indexes, created after the tables and the admin row are in. SQLite doesn't
+# index foreign keys itself; user_companies, page_scales, company_materials
+# and rfqs are already covered by their UNIQUE constraints.
+SCHEMA_INDEXES = (
+    'CREATE INDEX IF NOT EXISTS idx_items_drawing_page ON detected_items(drawing_id, page_number)',
+    'CREATE INDEX IF NOT EXISTS idx_items_drawing_type ON detected_items(drawing_id, item_type)',
+    'CREATE INDEX IF NOT EXISTS idx_items_wbs ON detected_items(wbs_category_id)',
+    'CREATE INDEX IF NOT EXISTS idx_drawings_project ON drawings(project_id)',
+    'CREATE INDEX IF NOT EXISTS idx_projects_company ON projects(company_id, updated_at DESC)',
+    'CREATE INDEX IF NOT EXISTS idx_wbs_project ON wbs_categories(project_id, parent_id)',
+    'CREATE INDEX IF NOT EXISTS idx_wbs_parent ON wbs_categories(parent_id)',
+    'CREATE INDEX IF NOT EXISTS idx_custom_scales_project ON custom_scales(project_id)',
+    'CREATE INDEX IF NOT EXISTS idx_scale_zones_drawing_page ON scale_zones(drawing_id, page_number)',
+    'CREATE INDEX IF NOT EXISTS idx_takeoff_drawing_page_wbs ON takeoff_items(drawing_id, page_number, wbs_category_id)',
+    'CREATE INDEX IF NOT EXISTS idx_takeoff_material ON takeoff_items(material_id)',
+    'CREATE INDEX IF NOT EXISTS idx_materials_company_active_cat ON company_materials(company_id, is_active, category)',
+    'CREATE INDEX IF NOT EXISTS idx_rfq_items_rfq ON rfq_items(rfq_id)',
+    # Superseded by the wider indexes above (prefixes of them)
+    'DROP INDEX IF EXISTS idx_takeoff_drawing_page',
+    'DROP INDEX IF EXISTS idx_materials_company_category',
+)
+
+# Set once init_db has brought the schema up in this process
+_db_initialized = False
+
+def init_db(verbose=True, force=False):
+    """
+    Initialize database with complete schema including materials
     
-    conn.commit()
-    conn.close()
+    Idempotent; after the first successful run in a process further calls
+    return immediately.
     
-    print("=" * 60)
-    print("Database initialization complete!")
-    print("=" * 60)
-
-def load_default_materials_for_company(company_id):
-    """Load default materials database when a new company is created"""
-    from database.materials_db import DEFAULT_MATERIALS
+    Args:
+        verbose: Print progress and the default admin credentials
+        force: Run again even if this process already initialized the database
+    """
+    global _db_initialized
+    if _db_initialized and not force:
+        return
     
     conn = sqlite3.connect(Config.DATABASE_PATH)
     c = conn.cursor()
     
-    # Check if company already has materials
-    existing = c.execute(
-        'SELECT COUNT(*) FROM company_materials WHERE company_id = ?',
-        (company_id,)
-    ).fetchone()[0]
+    # WAL is persistent, so the file is in WAL mode before any worker opens it
+    c.execute('PRAGMA journal_mode = WAL').fetchone()
+    c.execute('PRAGMA synchronous = NORMAL')
     
-    if existing > 0:
-        print(f"Company {company_id} already has materials")
-        conn.close()
-        return
+    if verbose:
+        print("=" * 60)
+        print("Initializing Database Schema...")
+        print("=" * 60)
     
-    # Insert default materials
-    for material in DEFAULT_MATERIALS:
-        c.execute('''
-            INSERT INTO company_materials 
-            (company_id, part_number, category, description, size, unit, list_price, labor_units)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (company_id,) + material)
+    # One explicit transaction: the schema comes up completely or not at all
+    conn.isolation_level = None
+    admin_created = False
+    try:
+        c.executescript('BEGIN;' + SCHEMA_DDL)
+        
+        # ============ Create Default Admin User ============
+        
+        if not c.execute('SELECT 1 FROM users WHERE is_admin = 1 LIMIT 1').fetchone():
+            admin_hash = hash_password('admin123')
+            c.execute(
+                'INSERT INTO users (email, password_hash, first_name, last_name, is_admin) VALUES (?, ?, ?, ?, ?)',
+                ('admin@example.com', admin_hash, 'Admin', 'User', 1)
+            )
+            admin_created = True
+        
+        # Keep the catalog copy in step with the code
+        from database.materials_db import iter_default_materials
+        c.execute('DELETE FROM default_materials')
+        c.executemany('INSERT INTO default_materials VALUES (?, ?, ?, ?, ?, ?, ?)', iter_default_materials())
+        
+        c.execute('DELETE FROM takeoff_rollup')
+        c.execute(REBUILD_TAKEOFF_ROLLUP_SQL)
+        
+        # Indexes last, over the rows already loaded
+        for statement in SCHEMA_INDEXES:
+            c.execute(statement)
+        c.execute('ANALYZE')
+        set_schema_version(conn, MATERIALS_SCHEMA_VERSION)
+        c.execute('COMMIT')
+    except sqlite3.Error:
+        c.execute('ROLLBACK')
+        raise
+    finally:
+        conn.close()
+    _db_initialized = True
     
-    conn.commit()
-    conn.close()
+    if verbose:
+        print("✓ Tables and indexes")
+        if admin_created:
+            print("✓ Default admin user created")
+            print("  Email: admin@example.com")
+            print("  Password: admin123")
+        print("=" * 60)
+        print("Database initialization complete!")
+        print("=" * 60)
+
+# Copies the default catalog (default_materials, refreshed by init_db) to a
+# company. Kept as one constant string so the pooled connection's statement
+# cache reuses the prepared statement for every new company
+COPY_DEFAULT_MATERIALS_SQL = '''
+    INSERT INTO company_materials 
+    (company_id, part_number, category, description, size, unit, list_price, labor_units)
+    SELECT ?, part_number, category, description, size, unit, list_price, labor_units
+    FROM default_materials ORDER BY rowid
+'''
+
+def load_default_materials_for_company(company_id):
+    """Load default materials database when a new company is created"""
+    # Check and copy under one write lock, on the request's pooled connection
+    with write_tx() as db:
+        existing = db.execute(
+            'SELECT 1 FROM company_materials WHERE company_id = ? LIMIT 1',
+            (company_id,)
+        ).fetchone()
+        
+        if existing:
+            logger.info("Company %s already has materials", company_id)
+            return
+        
+        loaded = db.execute(COPY_DEFAULT_MATERIALS_SQL, (company_id,)).rowcount
     
-    print(f"✓ Loaded {len(DEFAULT_MATERIALS)} default materials for company {company_id}")
\ No newline at end of file
+    logger.info("Loaded %s default materials for company %s", loaded, company_id)
\ No newline at end of file
@@ -1,9 +1,12 @@
 """
 Database models and query functions
 """
+import logging
 import os
-from .db import get_db
-from werkzeug.security import generate_password_hash
+from config import Config
+from .db import get_db, write_tx, insert_rows, hash_password, ttl_cache
+
+logger = logging.getLogger(__name__)
 
 # Company Functions
 def create_company(name, address=None, phone=None):
@@ -15,48 +18,100 @@ def create_company(name, address=None, phone=None):
         (name, address, phone)
     )
     db.commit()
+    # A miss for this id may already be cached
+    get_company_cached.cache_clear()
     return cursor.lastrowid
 
-def get_companies():
-    """Get all companies"""
+def get_companies(limit=-1, offset=0):
+    """Get companies by name, optionally one page at a time (limit -1 for all)"""
+    db = get_db()
+    return db.execute(
+        'SELECT * FROM companies ORDER BY name LIMIT ? OFFSET ?', (limit, offset)
+    ).fetchall()
+
+def count_companies():
+    """Get the total number of companies"""
     db = get_db()
-    return db.execute('SELECT * FROM companies ORDER BY name').fetchall()
+    return db.execute('SELECT COUNT(*) FROM companies').fetchone()[0]
 
 def get_company(company_id):
     """Get a specific company"""
     db = get_db()
     return db.execute('SELECT * FROM companies WHERE id = ?', (company_id,)).fetchone()
 
+@ttl_cache(Config.LOOKUP_CACHE_TTL)
+def get_company_cached(company_id):
+    """Get a company as a dict, memoized per process for a few seconds (cleared on company changes)"""
+    company = get_company(company_id)
+    return dict(company) if company else None
+
 def delete_company(company_id):
     """Delete a company"""
     db = get_db()
     db.execute('DELETE FROM companies WHERE id = ?', (company_id,))
     db.commit()
+    get_company_cached.cache_clear()
 
 # User Functions
 def create_user(email, password, first_name=None, last_name=None, is_admin=False):
     """Create a new user"""
     db = get_db()
     cursor = db.cursor()
-    password_hash = generate_password_hash(password)
+    password_hash = hash_password(password)
     cursor.execute(
         'INSERT INTO users (email, password_hash, first_name, last_name, is_admin) VALUES (?, ?, ?, ?, ?)',
         (email, password_hash, first_name, last_name, is_admin)
     )
     db.commit()
+    get_user_cached.cache_clear()
     return cursor.lastrowid
 
-def get_users():
-    """Get all users with their companies"""
+def get_users(limit=-1, after_id=0, offset=0):
+    """
+    Get users with their companies, a page at a time
+    
+    Args:
+        limit: Page size (-1 for all users)
+        after_id: Return users with an id greater than this (keyset cursor)
+        offset: Rows to skip after the cursor (for numbered pages)
+    
+    Returns:
+        list: User dicts (without password hashes) with a 'companies' string
+    """
+    db = get_db()
+    users = [dict(u) for u in db.execute(
+        '''SELECT id, email, first_name, last_name, is_admin, created_at
+        FROM users WHERE id > ? ORDER BY id LIMIT ? OFFSET ?''',
+        (after_id, limit, offset)
+    ).fetchall()]
+    if not users:
+        return users
+    
+    # Company names for just this page of users, stitched in Python
+    companies = {}
+    for row in db.execute(
+        '''SELECT uc.user_id, c.name FROM user_companies uc
+        JOIN companies c ON c.id = uc.company_id
+        WHERE uc.user_id BETWEEN ? AND ?''',
+        (users[0]['id'], users[-1]['id'])
+    ):
+        companies.setdefault(row['user_id'], []).append(row['name'])
+    
+    for user in users:
+        names = companies.get(user['id'])
+        user['companies'] = ', '.join(names) if names else None
+    return users
+
+def update_user_password(user_id, password):
+    """Re-hash and store a user's password"""
+    db = get_db()
+    db.execute('UPDATE users SET password_hash = ? WHERE id = ?', (hash_password(password), user_id))
+    db.commit()
+
+def count_users():
+    """Get the total number of users"""
     db = get_db()
-    return db.execute('''
-        SELECT u.*, GROUP_CONCAT(c.name, ', ') as companies
-        FROM users u
-        LEFT JOIN user_companies uc ON u.id = uc.user_id
-        LEFT JOIN companies c ON uc.company_id = c.id
-        GROUP BY u.id
-        ORDER BY u.email
-    ''').fetchall()
+    return db.execute('SELECT COUNT(*) FROM users').fetchone()[0]
 
 def get_user_by_email(email):
     """Get user by email"""
@@ -68,11 +123,22 @@ def get_user_by_id(user_id):
     db = get_db()
     return db.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
 
+@ttl_cache(Config.LOOKUP_CACHE_TTL)
+def get_user_cached(user_id):
+    """Get a user as a dict without the password hash, memoized per process for a few seconds (cleared on user changes)"""
+    user = get_user_by_id(user_id)
+    if not user:
+        return None
+    user = dict(user)
+    del user['password_hash']
+    return user
+
 def delete_user(user_id):
     """Delete a user"""
     db = get_db()
     db.execute('DELETE FROM users WHERE id = ?', (user_id,))
     db.commit()
+    get_user_cached.cache_clear()
 
 # User-Company Relationship Functions
 def add_user_to_company(user_id, company_id, role='user'):
@@ -171,17 +237,72 @@ def get_drawings_by_project(project_id):
         (project_id,)
     ).fetchall()
 
+def get_drawings_with_counts_by_project(project_id):
+    """
+    Get all drawings for a project with their detected/takeoff item counts
+
+    Use this instead of counting items drawing by drawing. The counts are
+    per-table subqueries - joining both tables would multiply the rows.
+    """
+    db = get_db()
+    return db.execute(
+        '''SELECT d.*,
+                  (SELECT COUNT(*) FROM detected_items WHERE drawing_id = d.id) AS item_count,
+                  (SELECT COUNT(*) FROM takeoff_items WHERE drawing_id = d.id) AS takeoff_count
+           FROM drawings d
+           WHERE d.project_id = ?
+           ORDER BY d.created_at''',
+        (project_id,)
+    ).fetchall()
+
+def get_project_bundle(project_id):
+    """
+    Get a project's drawings (with counts), WBS tree, and page scales
+
+    Three queries for the whole project; use this instead of looking up
+    page scales drawing by drawing. page_scales maps drawing id to its rows.
+    """
+    db = get_db()
+    page_scales = {}
+    for row in db.execute(
+        '''SELECT ps.* FROM page_scales ps
+           JOIN drawings d ON ps.drawing_id = d.id
+           WHERE d.project_id = ?
+           ORDER BY ps.drawing_id, ps.page_number''',
+        (project_id,)
+    ):
+        page_scales.setdefault(row['drawing_id'], []).append(dict(row))
+
+    return {
+        'drawings': [dict(d) for d in get_drawings_with_counts_by_project(project_id)],
+        'wbs_tree': get_wbs_categories_tree(project_id),
+        'page_scales': page_scales
+    }
+
 def get_drawing(drawing_id):
     """Get a specific drawing"""
     db = get_db()
     return db.execute('SELECT * FROM drawings WHERE id = ?', (drawing_id,)).fetchone()
 
+def drawing_exists(drawing_id):
+    """Check whether a drawing (still) exists"""
+    db = get_db()
+    return db.execute('SELECT 1 FROM drawings WHERE id = ? LIMIT 1', (drawing_id,)).fetchone() is not None
+
 def update_drawing(drawing_id, name):
     """Update drawing name"""
     db = get_db()
     db.execute('UPDATE drawings SET name = ? WHERE id = ?', (name, drawing_id))
     db.commit()
 
+def get_page_count_for_file(file_path):
+    """Page count already recorded for a stored file (None if no drawing uses it)"""
+    db = get_db()
+    row = db.execute(
+        'SELECT page_count FROM drawings WHERE file_path = ? LIMIT 1', (file_path,)
+    ).fetchone()
+    return row['page_count'] if row else None
+
 def update_drawing_scale(drawing_id, scale):
     """Update drawing scale"""
     db = get_db()
@@ -195,21 +316,33 @@ def delete_drawing(drawing_id):
     # Get the drawing to retrieve file path before deleting
     drawing = db.execute('SELECT file_path FROM drawings WHERE id = ?', (drawing_id,)).fetchone()
     
-    if drawing:
-        # Delete the physical file if it exists
+    # Uploads are stored by content hash, so other drawings may share the file
+    shared = drawing and db.execute(
+        'SELECT 1 FROM drawings WHERE file_path = ? AND id != ? LIMIT 1',
+        (drawing['file_path'], drawing_id)
+    ).fetchone()
+    
+    if drawing and not shared:
+        # Delete the physical file if it exists (no exists() check first -
+        # one syscall, and no race with a concurrent delete)
         file_path = drawing['file_path']
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-                print(f"✓ Deleted file: {file_path}")
-            except Exception as e:
-                print(f"⚠ Warning: Could not delete file {file_path}: {e}")
+        try:
+            os.unlink(file_path)
+            logger.info("Deleted file: %s", file_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Could not delete file %s: %s", file_path, e)
     
     # Delete the database record (this will cascade delete detected_items)
     db.execute('DELETE FROM drawings WHERE id = ?', (drawing_id,))
     db.commit()
 
 # Detected Items Functions
+DETECTED_ITEM_COLUMNS = (
+    'drawing_id', 'page_number', 'item_type', 'x', 'y', 'width', 'height', 'confidence', 'verified'
+)
+
 def create_detected_item(drawing_id, page_number, item_type, x, y, width, height, confidence, verified=False):
     """Create a detected item"""
     db = get_db()
@@ -223,6 +356,35 @@ def create_detected_item(drawing_id, page_number, item_type, x, y, width, height
     db.commit()
     return cursor.lastrowid
 
+def save_detection_results(drawing_id, scale, items_by_page):
+    """
+    Store a drawing's detected scale and items in a single transaction
+    
+    Args:
+        items_by_page: {page_number: [detected item dicts]}
+    """
+    with write_tx() as db:
+        db.execute('UPDATE drawings SET scale = ? WHERE id = ?', (scale, drawing_id))
+        insert_rows(db, 'detected_items', DETECTED_ITEM_COLUMNS, [
+            (drawing_id, page_number, item['type'], item['x'], item['y'],
+             item['width'], item['height'], item['confidence'], False)
+            for page_number, items in items_by_page.items() for item in items
+        ])
+
+def bulk_create_detected_items(drawing_id, rows):
+    """
+    Create many detected items for a drawing in one transaction
+    
+    Args:
+        rows: (page_number, item_type, x, y, width, height, confidence, verified) tuples
+    
+    Returns:
+        int: Number of items created
+    """
+    with write_tx() as db:
+        return insert_rows(db, 'detected_items', DETECTED_ITEM_COLUMNS,
+                           ((drawing_id,) + tuple(row) for row in rows))
+
 def get_detected_items(drawing_id, page_number=None):
     """Get detected items for a drawing"""
     db = get_db()
@@ -237,12 +399,35 @@ def get_detected_items(drawing_id, page_number=None):
             (drawing_id,)
         ).fetchall()
 
+def get_detected_item_boxes(drawing_id, page_number=None):
+    """
+    Get (id, item_type, x, y, width, height, verified) tuples for detected items
+
+    Plain tuples for the canvas overlay, which reads every row by position.
+    """
+    db = get_db(raw=True)
+    columns = 'SELECT id, item_type, x, y, width, height, verified FROM detected_items'
+    if page_number is not None:
+        return db.execute(
+            columns + ' WHERE drawing_id = ? AND page_number = ?',
+            (drawing_id, page_number)
+        ).fetchall()
+    else:
+        return db.execute(columns + ' WHERE drawing_id = ?', (drawing_id,)).fetchall()
+
 def update_detected_item(item_id, item_type=None, verified=None, notes=None):
-    """Update a detected item"""
+    """Update a detected item (fields left as None keep their current value)"""
+    fields = {field: value for field, value in (
+        ('item_type', item_type), ('verified', verified), ('notes', notes)
+    ) if value is not None}
+    if not fields:
+        return
+    
     db = get_db()
+    assignments = ', '.join(f'{field} = ?' for field in fields)
     db.execute(
-        'UPDATE detected_items SET item_type = ?, verified = ?, notes = ? WHERE id = ?',
-        (item_type, verified, notes, item_id)
+        f'UPDATE detected_items SET {assignments} WHERE id = ?',
+        [*fields.values(), item_id]
     )
     db.commit()
 
@@ -392,23 +577,19 @@ def check_wbs_category_has_items(category_id):
     """Check if a WBS category has any items assigned to it"""
     db = get_db()
     
-    count = db.execute(
-        'SELECT COUNT(*) as count FROM detected_items WHERE wbs_category_id = ?',
+    return db.execute(
+        'SELECT 1 FROM detected_items WHERE wbs_category_id = ? LIMIT 1',
         (category_id,)
-    ).fetchone()['count']
-    
-    return count > 0
+    ).fetchone() is not None
 
 def check_wbs_category_has_children(category_id):
     """Check if a WBS category has any child categories"""
     db = get_db()
     
-    count = db.execute(
-        'SELECT COUNT(*) as count FROM wbs_categories WHERE parent_id = ?',
+    return db.execute(
+        'SELECT 1 FROM wbs_categories WHERE parent_id = ? LIMIT 1',
         (category_id,)
-    ).fetchone()['count']
-    
-    return count > 0
+    ).fetchone() is not None
 
 def get_wbs_path(category_id):
     """Get the full path of a category (e.g., 'Base Bid > UG Water')"""
@@ -475,14 +656,12 @@ def update_detected_item_wbs(item_id, wbs_category_id):
 
 def bulk_update_items_wbs(item_ids, wbs_category_id):
     """Update WBS category for multiple items at once"""
-    db = get_db()
-    
     placeholders = ','.join('?' * len(item_ids))
-    db.execute(
-        f'UPDATE detected_items SET wbs_category_id = ? WHERE id IN ({placeholders})',
-        [wbs_category_id] + item_ids
-    )
-    db.commit()
+    with write_tx() as db:
+        db.execute(
+            f'UPDATE detected_items SET wbs_category_id = ? WHERE id IN ({placeholders})',
+            [wbs_category_id] + item_ids
+        )
 
 # Scale Management Functions
 
@@ -513,44 +692,44 @@ def delete_custom_scale(scale_id):
 
 def set_page_scale(drawing_id, page_number, scale_id=None, scale_name=None, pixels_per_unit=None):
     """Set or update the scale for a specific page"""
-    db = get_db()
-    
-    # Check if page scale already exists
-    existing = db.execute(
-        'SELECT id FROM page_scales WHERE drawing_id = ? AND page_number = ?',
-        (drawing_id, page_number)
-    ).fetchone()
-    
-    if existing:
-        # Update existing record
-        db.execute(
-            '''UPDATE page_scales 
-               SET scale_id = ?, scale_name = ?, pixels_per_unit = ?, updated_at = CURRENT_TIMESTAMP 
-               WHERE id = ?''',
-            (scale_id, scale_name, pixels_per_unit, existing['id'])
-        )
-        print(f"Updated scale for drawing {drawing_id}, page {page_number}: {scale_name} ({scale_id})")
-    else:
-        # Insert new record
-        db.execute(
-            '''INSERT INTO page_scales (drawing_id, page_number, scale_id, scale_name, pixels_per_unit) 
-               VALUES (?, ?, ?, ?, ?)''',
-            (drawing_id, page_number, scale_id, scale_name, pixels_per_unit)
-        )
-        print(f"Created scale for drawing {drawing_id}, page {page_number}: {scale_name} ({scale_id})")
-    
-    db.commit()
-    
-    # Verify the save
+    # Check and write under one write lock, so concurrent saves can't both insert
+    with write_tx() as db:
+        # Check if page scale already exists
+        existing = db.execute(
+            'SELECT id FROM page_scales WHERE drawing_id = ? AND page_number = ?',
+            (drawing_id, page_number)
+        ).fetchone()
+        
+        if existing:
+            # Update existing record
+            db.execute(
+                '''UPDATE page_scales 
+                   SET scale_id = ?, scale_name = ?, pixels_per_unit = ?, updated_at = CURRENT_TIMESTAMP 
+                   WHERE id = ?''',
+                (scale_id, scale_name, pixels_per_unit, existing['id'])
+            )
+            logger.debug("Updated scale for drawing %s, page %s: %s (%s)", drawing_id, page_number, scale_name, scale_id)
+        else:
+            # Insert new record
+            db.execute(
+                '''INSERT INTO page_scales (drawing_id, page_number, scale_id, scale_name, pixels_per_unit) 
+                   VALUES (?, ?, ?, ?, ?)''',
+                (drawing_id, page_number, scale_id, scale_name, pixels_per_unit)
+            )
+            logger.debug("Created scale for drawing %s, page %s: %s (%s)", drawing_id, page_number, scale_name, scale_id)
+    
+    # Verify the save (a debugging aid - the read is skipped unless DEBUG is on)
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     result = db.execute(
         'SELECT * FROM page_scales WHERE drawing_id = ? AND page_number = ?',
         (drawing_id, page_number)
     ).fetchone()
     
     if result:
-        print(f"Verified - Scale ID in DB: {result['scale_id']}, Name: {result['scale_name']}")
+        logger.debug("Verified - Scale ID in DB: %s, Name: %s", result['scale_id'], result['scale_name'])
     else:
-        print(f"WARNING: Failed to verify scale save!")
+        logger.warning("Failed to verify scale save for drawing %s, page %s", drawing_id, page_number)
 
 def get_page_scale(drawing_id, page_number):
     """Get the scale for a specific page"""
@@ -561,9 +740,10 @@ def get_page_scale(drawing_id, page_number):
     ).fetchone()
     
     if result:
-        print(f"Retrieved scale for drawing {drawing_id}, page {page_number}: {result['scale_name']} ({result['scale_id']})")
+        logger.debug("Retrieved scale for drawing %s, page %s: %s (%s)",
+                     drawing_id, page_number, result['scale_name'], result['scale_id'])
     else:
-        print(f"No scale found for drawing {drawing_id}, page {page_number}")
+        logger.debug("No scale found for drawing %s, page %s", drawing_id, page_number)
     
     return result
 
@@ -0,0 +1,50 @@
+"""
+Gunicorn configuration for production deployments
+Usage: gunicorn -c gunicorn.conf.py wsgi:application
+"""
+import multiprocessing
+import os
+
+# Must be set before Config is imported - it turns DEBUG off
+os.environ.setdefault('FLASK_ENV', 'production')
+
+from config import Config
+
+bind = os.environ.get('GUNICORN_BIND', f'{Config.HOST}:{Config.PORT}')
+
+# Threaded workers. Much of the request work is CPU bound (PDF rasterizing,
+# edge/circle detection, argon2 hashing) and sqlite3 calls block, so
+# cooperative (gevent) workers would stall every request on a worker behind
+# one of them; real threads keep serving while OpenCV/argon2 release the GIL.
+# One thread per pooled database connection (Config.DB_POOL_SIZE).
+worker_class = 'gthread'
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = Config.DB_POOL_SIZE
+
+# Worker heartbeat - threaded workers keep reporting while a long request
+# (detecting every page of a large sheet) runs, so this is not a request limit
+timeout = 30
+
+# Hold idle connections from nginx's upstream keep-alive pool open longer
+# than nginx does (keepalive_timeout 60s), so nginx never reuses one
+# gunicorn has just closed
+keepalive = 75
+
+# Recycle workers periodically to cap memory growth from OpenCV/PyMuPDF
+max_requests = 1000
+max_requests_jitter = 100
+
+# Build the app once in the master and fork workers from it, so imports,
+# blueprints and compiled templates are shared copy-on-write. create_app
+# opens no database connections or files; each worker fills its own pool.
+# The page pre-render executor (routes/drawings.py) is created here too, but
+# starts its thread on first use, so each worker gets its own.
+preload_app = True
+
+def post_fork(server, worker):
+    """Drop per-process caches and connections inherited from the preloading master"""
+    from database.db import pool
+    from database.models import get_company_cached, get_user_cached
+    pool.reset()
+    get_company_cached.cache_clear()
+    get_user_cached.cache_clear()
\ No newline at end of file
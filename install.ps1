@@ -88,7 +88,7 @@ else {
     Write-Host "⚠ setup.py not found. Creating folders manually..." -ForegroundColor Yellow
     
     # Create directories
-    $directories = @("database", "routes", "services", "middleware", "templates", "data", "uploads")
+    $directories = @("database", "routes", "services", "middleware", "templates", "static", "data", "uploads")
     foreach ($dir in $directories) {
         if (!(Test-Path $dir)) {
             New-Item -ItemType Directory -Path $dir | Out-Null
@@ -108,6 +108,7 @@ $requiredFiles = @(
     "database\__init__.py",
     "database\db.py",
     "database\models.py",
+    "database\default_materials.csv",
     "routes\__init__.py",
     "routes\auth.py",
     "routes\admin.py",
@@ -121,7 +122,11 @@ $requiredFiles = @(
     "templates\login.html",
     "templates\company_select.html",
     "templates\admin.html",
-    "templates\main.html"
+    "templates\main.html",
+    "static\admin.css",
+    "static\admin.js",
+    "static\main.css",
+    "static\main.js"
 )
 
 $missingFiles = @()
@@ -153,7 +158,7 @@ Write-Host "Next steps:" -ForegroundColor Yellow
 Write-Host "1. Make sure all Python files are in their correct folders" -ForegroundColor White
 Write-Host "2. Make sure all HTML templates are in templates/ folder" -ForegroundColor White
 Write-Host "3. Run the application with:" -ForegroundColor White
-Write-Host "   python app.py" -ForegroundColor Cyan
+Write-Host "   run.bat" -ForegroundColor Cyan
 Write-Host ""
 Write-Host "The application will be available at:" -ForegroundColor White
 Write-Host "   http://localhost:5000" -ForegroundColor Cyan
@@ -172,12 +177,13 @@ if ($response -eq "y" -or $response -eq "Y") {
     Write-Host "Starting application..." -ForegroundColor Yellow
     Write-Host "Press Ctrl+C to stop the server" -ForegroundColor Yellow
     Write-Host ""
+    $env:FLASK_ENV = "development"
     python app.py
 }
 else {
     Write-Host ""
     Write-Host "You can start the application later by running:" -ForegroundColor White
-    Write-Host "   python app.py" -ForegroundColor Cyan
+    Write-Host "   run.bat" -ForegroundColor Cyan
     Write-Host ""
     Read-Host "Press Enter to exit"
 }
\ No newline at end of file
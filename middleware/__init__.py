@@ -3,5 +3,7 @@ Middleware package
 Authentication and authorization decorators
 """
 from .auth import login_required, admin_required, company_access_required
+from .session import FastSessionInterface
+from .caching import jsonify_conditional
 
-__all__ = ['login_required', 'admin_required', 'company_access_required']
\ No newline at end of file
+__all__ = ['login_required', 'admin_required', 'company_access_required', 'FastSessionInterface', 'jsonify_conditional']
\ No newline at end of file
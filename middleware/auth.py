@@ -3,7 +3,7 @@ Authentication and authorization decorators
 """
 from functools import wraps
 from flask import session, jsonify
-from database.models import get_user_by_id
+from database.models import get_user_cached
 
 def login_required(f):
     """Require user to be logged in"""
@@ -14,6 +14,11 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def is_admin():
+    """Whether the session's user still exists and is an admin (cached lookup)"""
+    user = get_user_cached(session['user_id'])
+    return bool(user and user['is_admin'])
+
 def admin_required(f):
     """Require user to be an admin"""
     @wraps(f)
@@ -21,9 +26,8 @@ def admin_required(f):
         if 'user_id' not in session:
             return jsonify({'error': 'Authentication required'}), 401
         
-        user = get_user_by_id(session['user_id'])
-        
-        if not user or not user['is_admin']:
+        # Checked against the user row, so a deleted or demoted admin loses access
+        if not is_admin():
             return jsonify({'error': 'Admin access required'}), 403
         return f(*args, **kwargs)
     return decorated_function
@@ -0,0 +1,17 @@
+"""
+Conditional responses
+JSON responses tagged with an ETag so clients can revalidate with If-None-Match
+"""
+from flask import jsonify, request
+
+def jsonify_conditional(data):
+    """
+    jsonify() with a content-hash ETag; answers 304 when the client's
+    If-None-Match still matches (saves the transfer and the client-side parse)
+    """
+    response = jsonify(data)
+    response.add_etag()
+    # Per-user data: revalidate every time, never store in shared caches
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
@@ -0,0 +1,18 @@
+"""
+Session interface
+Signed-cookie sessions that skip cookie verification on public paths
+"""
+from flask.sessions import SecureCookieSessionInterface
+
+class FastSessionInterface(SecureCookieSessionInterface):
+    """Signed-cookie sessions that never decode the cookie under /public/"""
+    
+    public_prefix = '/public/'
+    
+    def open_session(self, app, request):
+        # Returning None makes Flask use a read-only null session, so the
+        # HMAC check is skipped and no Set-Cookie is sent for these paths.
+        # (Requests without a session cookie are already cheap upstream.)
+        if request.path.startswith(self.public_prefix):
+            return None
+        return super().open_session(app, request)
\ No newline at end of file
@@ -1,12 +1,26 @@
 """
 Routes package
 API endpoint blueprints
+
+Blueprints are resolved lazily so importing one route module does not
+pull in the dependencies of all the others.
 """
-from .auth import auth_bp
-from .admin import admin_bp
-from .projects import projects_bp
-from .drawings import drawings_bp
-from .wbs import wbs_bp
-from .scales import scales_bp
-
-__all__ = ['auth_bp', 'admin_bp', 'projects_bp', 'drawings_bp', 'wbs_bp', 'scales_bp']
\ No newline at end of file
+import importlib
+
+_BLUEPRINT_MODULES = {
+    'auth_bp': '.auth',
+    'admin_bp': '.admin',
+    'projects_bp': '.projects',
+    'drawings_bp': '.drawings',
+    'wbs_bp': '.wbs',
+    'scales_bp': '.scales',
+    'materials_bp': '.materials',
+}
+
+__all__ = list(_BLUEPRINT_MODULES)
+
+def __getattr__(name):
+    if name in _BLUEPRINT_MODULES:
+        module = importlib.import_module(_BLUEPRINT_MODULES[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
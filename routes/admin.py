@@ -3,17 +3,19 @@
 Admin Routes - Company and User Management
 NOW WITH AUTOMATIC MATERIALS DATABASE LOADING
 """
+import logging
 from flask import Blueprint, request, jsonify, session
-from werkzeug.security import generate_password_hash
 from database.models import (
-    create_company, get_companies, delete_company,
-    create_user, get_users, delete_user, get_user_by_email,
+    create_company, get_companies, count_companies, delete_company,
+    create_user, get_users, count_users, delete_user, get_user_by_email,
     add_user_to_company, get_user_companies
 )
 from database.db import load_default_materials_for_company
 from middleware.auth import login_required, admin_required
+from middleware.caching import jsonify_conditional
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
+logger = logging.getLogger(__name__)
 
 # ============ Company Management ============
 
@@ -23,8 +25,13 @@ admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 def manage_companies():
     """Get all companies or create a new one"""
     if request.method == 'GET':
-        companies = get_companies()
-        return jsonify([dict(c) for c in companies])
+        # Optional paging: ?limit=50&offset=100 (total in X-Total-Count)
+        limit = request.args.get('limit', -1, type=int)
+        companies = get_companies(limit=limit, offset=request.args.get('offset', 0, type=int))
+        response = jsonify_conditional([dict(c) for c in companies])
+        if limit >= 0:
+            response.headers['X-Total-Count'] = count_companies()
+        return response
     
     elif request.method == 'POST':
         data = request.json
@@ -39,9 +46,9 @@ def manage_companies():
         # IMPORTANT: Load default materials database for new company
         try:
             load_default_materials_for_company(company_id)
-            print(f"✓ Default materials loaded for company: {data['name']}")
+            logger.info("Default materials loaded for company: %s", data['name'])
         except Exception as e:
-            print(f"⚠️  Error loading default materials: {e}")
+            logger.warning("Error loading default materials: %s", e)
         
         return jsonify({'id': company_id, 'name': data['name']}), 201
 
@@ -61,16 +68,18 @@ def delete_company_route(company_id):
 def manage_users():
     """Get all users or create a new one"""
     if request.method == 'GET':
-        users = get_users()
-        # Don't send password hashes
-        return jsonify([{
-            'id': u['id'],
-            'email': u['email'],
-            'first_name': u['first_name'],
-            'last_name': u['last_name'],
-            'is_admin': u['is_admin'],
-            'created_at': u['created_at']
-        } for u in users])
+        # Optional paging: ?limit=50 with &offset=100 or a keyset &after_id=<last id seen>
+        # (total in X-Total-Count)
+        limit = request.args.get('limit', -1, type=int)
+        users = get_users(
+            limit=limit,
+            after_id=request.args.get('after_id', 0, type=int),
+            offset=request.args.get('offset', 0, type=int)
+        )
+        response = jsonify(users)
+        if limit >= 0:
+            response.headers['X-Total-Count'] = count_users()
+        return response
     
     elif request.method == 'POST':
         data = request.json
@@ -2,10 +2,11 @@
 Authentication Routes
 Handles login, logout, and user session management
 """
-from flask import Blueprint, request, jsonify, session
-from werkzeug.security import check_password_hash
-from database.models import get_user_by_email, get_user_by_id, get_user_companies, check_user_company_access, get_company
+from flask import Blueprint, request, jsonify, session, g
+from database.db import verify_password, password_needs_rehash
+from database.models import update_user_password, get_user_by_email, get_user_cached, get_user_companies, check_user_company_access, get_company_cached
 from middleware.auth import login_required
+from middleware.caching import jsonify_conditional
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
@@ -21,9 +22,13 @@ def login():
     
     user = get_user_by_email(email)
     
-    if not user or not check_password_hash(user['password_hash'], password):
+    if not user or not verify_password(user['password_hash'], password):
         return jsonify({'error': 'Invalid email or password'}), 401
     
+    # Upgrade legacy PBKDF2 hashes to argon2 while we have the plain password
+    if password_needs_rehash(user['password_hash']):
+        update_user_password(user['id'], password)
+    
     # Set session
     session['user_id'] = user['id']
     session['user_email'] = user['email']
@@ -50,9 +55,9 @@ def logout():
 @login_required
 def get_current_user():
     """Get current logged-in user info"""
-    user = get_user_by_id(session['user_id'])
+    user = get_user_cached(session['user_id'])
     
-    return jsonify({
+    return jsonify_conditional({
         'id': user['id'],
         'email': user['email'],
         'first_name': user['first_name'],
@@ -75,21 +80,18 @@ def select_company(company_id):
     if not check_user_company_access(session['user_id'], company_id):
         return jsonify({'error': 'Access denied'}), 403
     
-    company = get_company(company_id)
+    company = get_company_cached(company_id)
     if not company:
         return jsonify({'error': 'Company not found'}), 404
     
     session['company_id'] = company_id
     session['company_name'] = company['name']
     
-    return jsonify({'success': True, 'company': dict(company)})
+    return jsonify({'success': True, 'company': company})
 
 @auth_bp.route('/current-company', methods=['GET'])
 @login_required
 def get_current_company():
     """Get currently selected company"""
-    if 'company_id' not in session:
-        return jsonify({'company': None})
-    
-    company = get_company(session['company_id'])
-    return jsonify({'company': dict(company) if company else None})
\ No newline at end of file
+    # Resolved (and cached) by the app's before_request hook
+    return jsonify({'company': g.company})
\ No newline at end of file
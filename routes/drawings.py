@@ -2,26 +2,60 @@
 Drawing Routes
 Drawing upload, processing, and detection management
 """
+import hashlib
 import os
-import io
-from datetime import datetime
-from flask import Blueprint, request, jsonify, session, send_file
-from werkzeug.utils import secure_filename
-import cv2
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, request, jsonify, session, send_file, current_app
 
 from config import Config
 from database.models import (
-    get_project, create_drawing, get_drawing, update_drawing_scale,
-    create_detected_item, get_detected_items, update_detected_item,
+    get_project, create_drawing, get_drawing, drawing_exists, get_page_count_for_file,
+    create_detected_item, save_detection_results, get_detected_items, get_detected_item_boxes,
+    update_detected_item,
     delete_detected_item, get_takeoff_summary, update_drawing, delete_drawing,
     get_takeoff_by_wbs_for_drawing
 )
-from services.pdf_processor import extract_pdf_page_as_image, get_pdf_page_count, detect_scale_notation
+from services.pdf_processor import (
+    extract_pdf_page_as_image, get_pdf_page_count, detect_scale_notation,
+    get_cached_page_path, prerender_pages, clear_page_cache
+)
 from services.detector import detect_plumbing_symbols
 from middleware.auth import login_required, company_access_required
 
 drawings_bp = Blueprint('drawings', __name__, url_prefix='/api')
 
+# Renders page previews after upload, off the request thread (one worker -
+# rendering is serialized by PyMuPDF's lock anyway). This is a real OS thread
+# under gunicorn's threaded workers (gunicorn.conf.py), and it takes the lock
+# one page at a time, so on-demand page renders interleave with it
+_prerender_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prerender')
+
+def _prerender(app, filepath, drawing_id, page_count):
+    """Background pre-render job for an uploaded drawing"""
+    # Own app context for the database checks (released when it exits)
+    with app.app_context():
+        prerender_pages(
+            filepath, drawing_id, page_count, Config.DISPLAY_DPI, Config.PREVIEW_FORMAT,
+            keep_going=lambda: drawing_exists(drawing_id)
+        )
+        # The drawing's file may be shared with others, so pages keep rendering
+        # after a delete - drop any written after its clear_page_cache ran
+        if not drawing_exists(drawing_id):
+            clear_page_cache(drawing_id)
+
+# Content types of the page cache formats
+IMAGE_MIMETYPES = {'png': 'image/png', 'jpg': 'image/jpeg', 'webp': 'image/webp'}
+
+def _preview_format():
+    """Config.PREVIEW_FORMAT if the client lists its type in Accept, else JPEG"""
+    # Matched literally - a bare */* (what fetch() sends) promises nothing
+    mimetype = IMAGE_MIMETYPES[Config.PREVIEW_FORMAT]
+    if any(value == mimetype for value, _ in request.accept_mimetypes):
+        return Config.PREVIEW_FORMAT
+    return 'jpg'
+
 # Drawing Upload
 @drawings_bp.route('/projects/<int:project_id>/drawings', methods=['POST'])
 @login_required
@@ -42,13 +76,21 @@ def upload_drawing(project_id):
     if not file.filename.lower().endswith(('.pdf', '.tif', '.tiff')):
         return jsonify({'error': 'Only PDF and TIFF files allowed'}), 400
     
-    filename = secure_filename(file.filename)
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f"{timestamp}_{filename}"
-    filepath = os.path.join(Config.UPLOAD_FOLDER, filename)
-    file.save(filepath)
+    # Store by content hash - identical re-uploads share one file on disk
+    data = file.read()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    extension = os.path.splitext(file.filename)[1].lower()
+    folder = os.path.join(Config.UPLOAD_FOLDER, digest[:2])
+    filepath = os.path.join(folder, digest + extension)
+    if not os.path.exists(filepath):
+        os.makedirs(folder, exist_ok=True)
+        tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, filepath)
     
-    page_count = get_pdf_page_count(filepath)
+    # Re-uploads reuse the page count recorded for the same file
+    page_count = get_page_count_for_file(filepath) or get_pdf_page_count(filepath)
     
     drawing_id = create_drawing(
         project_id=project_id,
@@ -57,6 +99,11 @@ def upload_drawing(project_id):
         page_count=page_count
     )
     
+    # Return now; the previews render in the background
+    _prerender_executor.submit(
+        _prerender, current_app._get_current_object(), filepath, drawing_id, page_count
+    )
+    
     return jsonify({
         'id': drawing_id,
         'name': file.filename,
@@ -76,23 +123,12 @@ def process_drawing(drawing_id):
     if not drawing:
         return jsonify({'error': 'Drawing not found'}), 404
     
-    img = extract_pdf_page_as_image(drawing['file_path'], page_number)
+    img = extract_pdf_page_as_image(drawing['file_path'], page_number, drawing_id=drawing_id)
     scale = detect_scale_notation(img)
     detected_items = detect_plumbing_symbols(img)
     
-    update_drawing_scale(drawing_id, scale)
-    
-    for item in detected_items:
-        create_detected_item(
-            drawing_id=drawing_id,
-            page_number=page_number,
-            item_type=item['type'],
-            x=item['x'],
-            y=item['y'],
-            width=item['width'],
-            height=item['height'],
-            confidence=item['confidence']
-        )
+    # One transaction for the scale update and all detected items
+    save_detection_results(drawing_id, scale, {page_number: detected_items})
     
     return jsonify({
         'scale': scale,
@@ -100,6 +136,39 @@ def process_drawing(drawing_id):
         'count': len(detected_items)
     })
 
+def _render_and_detect(drawing, page_number):
+    """Render one page (via the page cache) and run detection on it"""
+    img = extract_pdf_page_as_image(drawing['file_path'], page_number, drawing_id=drawing['id'])
+    return detect_scale_notation(img), detect_plumbing_symbols(img)
+
+@drawings_bp.route('/drawings/<int:drawing_id>/process_all', methods=['POST'])
+@login_required
+@company_access_required
+def process_all_pages(drawing_id):
+    """Process every page of a drawing to detect fixtures"""
+    drawing = get_drawing(drawing_id)
+    if not drawing:
+        return jsonify({'error': 'Drawing not found'}), 404
+    
+    # Pages render one at a time (PyMuPDF's lock; usually cache hits after the
+    # upload pre-render), but detection overlaps on real threads since OpenCV
+    # releases the GIL - gunicorn runs threaded workers (gunicorn.conf.py)
+    pages = range(drawing['page_count'] or 1)
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+        results = list(executor.map(lambda page: _render_and_detect(drawing, page), pages))
+    
+    # The drawing has a single scale - take it from the first page
+    scale = results[0][0]
+    items_by_page = {page: items for page, (_, items) in zip(pages, results)}
+    save_detection_results(drawing_id, scale, items_by_page)
+    
+    return jsonify({
+        'scale': scale,
+        'pages': [{'page_number': page, 'detected_items': items, 'count': len(items)}
+                  for page, items in items_by_page.items()],
+        'count': sum(len(items) for items in items_by_page.values())
+    })
+
 # Drawing Image Retrieval
 @drawings_bp.route('/drawings/<int:drawing_id>/page/<int:page_num>/image')
 @login_required
@@ -109,20 +178,61 @@ def get_drawing_page_image(drawing_id, page_num):
     if not drawing:
         return jsonify({'error': 'Drawing not found'}), 404
     
-    img = extract_pdf_page_as_image(drawing['file_path'], page_num, dpi=100)
+    # Rendered once (usually in the background after upload), then served
+    # straight from the page cache
+    fmt = _preview_format()
+    path = get_cached_page_path(drawing['file_path'], drawing_id, page_num, dpi=Config.DISPLAY_DPI, fmt=fmt)
     
-    _, buffer = cv2.imencode('.png', img)
-    io_buf = io.BytesIO(buffer)
+    # Let nginx stream the file when it fronts the app
+    if Config.PAGE_CACHE_ACCEL_PREFIX:
+        response = current_app.response_class(mimetype=IMAGE_MIMETYPES[fmt])
+        response.headers['X-Accel-Redirect'] = Config.PAGE_CACHE_ACCEL_PREFIX + os.path.basename(path)
+    else:
+        # ETag/Last-Modified come from the cached file's mtime and size
+        response = send_file(os.path.abspath(path), mimetype=IMAGE_MIMETYPES[fmt], conditional=True)
     
-    return send_file(io_buf, mimetype='image/png')
+    response.vary.add('Accept')
+    response.cache_control.no_cache = None
+    response.cache_control.private = True
+    response.cache_control.max_age = Config.PAGE_IMAGE_MAX_AGE
+    response.cache_control.immutable = True
+    return response
 
 # Detected Items Management
+
+# Binary item record: id, item type index, x, y, width, height, verified
+ITEM_RECORD = struct.Struct('<IHhhhhB')
+
+def _pack_items(items):
+    """
+    Pack detected item boxes (get_detected_item_boxes) for the canvas overlay (?format=bin)
+    
+    Layout (little-endian): u16 type count, then per type a u16 byte length
+    and its UTF-8 name; then one ITEM_RECORD per item, coordinates rounded
+    to whole pixels.
+    """
+    type_index = {}
+    records = []
+    for item_id, item_type, x, y, width, height, verified in items:
+        index = type_index.setdefault(item_type, len(type_index))
+        records.append(ITEM_RECORD.pack(
+            item_id, index, round(x), round(y), round(width), round(height), 1 if verified else 0
+        ))
+    
+    names = [name.encode('utf-8') for name in type_index]
+    header = [struct.pack('<H', len(names))]
+    header.extend(struct.pack('<H', len(name)) + name for name in names)
+    return b''.join(header + records)
+
 @drawings_bp.route('/drawings/<int:drawing_id>/items', methods=['GET', 'POST'])
 @login_required
 def manage_drawing_items(drawing_id):
     """Get or add detected items"""
     if request.method == 'GET':
         page_num = request.args.get('page', type=int)
+        if request.args.get('format') == 'bin':
+            items = get_detected_item_boxes(drawing_id, page_num)
+            return current_app.response_class(_pack_items(items), mimetype='application/octet-stream')
         items = get_detected_items(drawing_id, page_num)
         return jsonify([dict(item) for item in items])
     
@@ -211,4 +321,5 @@ def drawing_detail(drawing_id):
     
     elif request.method == 'DELETE':
         delete_drawing(drawing_id)
+        clear_page_cache(drawing_id)
         return '', 204
\ No newline at end of file
@@ -5,13 +5,13 @@ Company materials database and takeoff management
 """
 from flask import Blueprint, request, jsonify, session
 from database.materials_db import (
-    get_company_materials, get_material, create_material, update_material, delete_material,
+    get_company_materials, get_company_material_categories, get_material, create_material, update_material, delete_material,
     create_takeoff_item, get_takeoff_items, get_project_takeoff_summary,
     update_takeoff_item, delete_takeoff_item,
-    create_rfq, add_rfq_item, get_project_rfqs, get_rfq_with_items, update_rfq_status
+    create_rfq, add_rfq_items, get_project_rfqs, get_rfq_with_items, update_rfq_status
 )
 from database.models import get_project, get_drawing, get_wbs_categories
-from middleware.auth import login_required, company_access_required, admin_required
+from middleware.auth import login_required, company_access_required, admin_required, is_admin
 
 materials_bp = Blueprint('materials', __name__, url_prefix='/api')
 
@@ -34,14 +34,7 @@ def get_materials():
 @company_access_required
 def get_material_categories():
     """Get unique material categories for current company"""
-    company_id = session['company_id']
-    materials = get_company_materials(company_id, active_only=False)
-    
-    categories = set()
-    for material in materials:
-        categories.add(material['category'])
-    
-    return jsonify(sorted(list(categories)))
+    return jsonify(get_company_material_categories(session['company_id']))
 
 @materials_bp.route('/materials', methods=['POST'])
 @login_required
@@ -84,9 +77,7 @@ def material_detail(material_id):
     
     elif request.method == 'PUT':
         # Require admin for updates
-        from database.models import get_user_by_id
-        user = get_user_by_id(session['user_id'])
-        if not user or not user['is_admin']:
+        if not is_admin():
             return jsonify({'error': 'Admin access required'}), 403
         
         data = request.json
@@ -105,9 +96,7 @@ def material_detail(material_id):
     
     elif request.method == 'DELETE':
         # Require admin for deletion
-        from database.models import get_user_by_id
-        user = get_user_by_id(session['user_id'])
-        if not user or not user['is_admin']:
+        if not is_admin():
             return jsonify({'error': 'Admin access required'}), 403
         
         delete_material(material_id)
@@ -184,8 +173,8 @@ def project_takeoff_summary_route(project_id):
     if not project or project['company_id'] != session['company_id']:
         return jsonify({'error': 'Access denied'}), 403
     
-    summary = get_project_takeoff_summary(project_id)
-    return jsonify([dict(item) for item in summary])
+    # Already plain dicts
+    return jsonify(get_project_takeoff_summary(project_id))
 
 # ============ RFQ Management ============
 
@@ -216,14 +205,15 @@ def project_rfqs(project_id):
         )
         
         # Add items to RFQ
-        for item in data.get('items', []):
-            add_rfq_item(
-                rfq_id=rfq_id,
-                material_id=item['material_id'],
-                quantity=float(item['quantity']),
-                unit=item['unit'],
-                notes=item.get('notes')
-            )
+        add_rfq_items(rfq_id, [
+            {
+                'material_id': item['material_id'],
+                'quantity': float(item['quantity']),
+                'unit': item['unit'],
+                'notes': item.get('notes')
+            }
+            for item in data.get('items', [])
+        ])
         
         return jsonify({'id': rfq_id, 'rfq_number': data['rfq_number']}), 201
 
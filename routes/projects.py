@@ -5,9 +5,10 @@ Project management for companies
 from flask import Blueprint, request, jsonify, session
 from database.models import (
     create_project, get_projects_by_company, get_project, delete_project,
-    get_drawings_by_project, create_default_wbs_categories
+    get_drawings_with_counts_by_project, create_default_wbs_categories
 )
 from middleware.auth import login_required, company_access_required
+from middleware.caching import jsonify_conditional
 
 projects_bp = Blueprint('projects', __name__, url_prefix='/api/projects')
 
@@ -20,7 +21,7 @@ def manage_projects():
     
     if request.method == 'GET':
         projects = get_projects_by_company(company_id)
-        return jsonify([dict(p) for p in projects])
+        return jsonify_conditional([dict(p) for p in projects])
     
     elif request.method == 'POST':
         data = request.json
@@ -52,7 +53,7 @@ def project_detail(project_id):
         return jsonify({'error': 'Access denied'}), 403
     
     if request.method == 'GET':
-        drawings = get_drawings_by_project(project_id)
+        drawings = get_drawings_with_counts_by_project(project_id)
         return jsonify({
             'project': dict(project),
             'drawings': [dict(d) for d in drawings]
@@ -45,6 +45,8 @@ echo Press Ctrl+C to stop the server
 echo ============================================================
 echo.
 
+REM Development mode: debug server and template auto-reload
+set FLASK_ENV=development
 python app.py
 
 pause
\ No newline at end of file
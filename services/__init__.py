@@ -2,12 +2,18 @@
 Services package
 Business logic and processing services
 """
-from .pdf_processor import extract_pdf_page_as_image, get_pdf_page_count, detect_scale_notation
+from .pdf_processor import (
+    extract_pdf_page_as_image, get_pdf_page_count, detect_scale_notation,
+    get_cached_page_path, prerender_pages, clear_page_cache
+)
 from .detector import detect_plumbing_symbols
 
 __all__ = [
     'extract_pdf_page_as_image',
     'get_pdf_page_count', 
     'detect_scale_notation',
+    'get_cached_page_path',
+    'prerender_pages',
+    'clear_page_cache',
     'detect_plumbing_symbols'
 ]
\ No newline at end of file
@@ -2,10 +2,40 @@
 Computer Vision Detection Service
 Detects plumbing fixtures and equipment in drawings
 """
+import threading
+
 import cv2
 import numpy as np
 from config import Config
 
+def _cuda_device_available():
+    """True when OpenCV was built with CUDA and a CUDA device is present"""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
+# The pip OpenCV wheels have no CUDA support, so this is normally False
+CUDA_AVAILABLE = _cuda_device_available()
+
+# CUDA filter objects keep device buffers between calls, so each thread
+# (process_all runs pages on a thread pool) builds its own set once
+_cuda_filters = threading.local()
+
+def _get_cuda_filters():
+    """This thread's (canny, median, hough) CUDA filters"""
+    filters = getattr(_cuda_filters, 'value', None)
+    if filters is None:
+        filters = _cuda_filters.value = (
+            cv2.cuda.createCannyEdgeDetector(50, 150),
+            cv2.cuda.createMedianFilter(cv2.CV_8UC1, 5),
+            cv2.cuda.createHoughCirclesDetector(
+                1, 25, 50, 30,
+                Config.DETECTION_MIN_RADIUS // 2, Config.DETECTION_MAX_RADIUS // 2
+            ),
+        )
+    return filters
+
 def detect_plumbing_symbols(img):
     """
     Detect plumbing fixtures using computer vision
@@ -19,93 +49,158 @@ def detect_plumbing_symbols(img):
     Detection methods:
     - Hough Circle Detection for circular fixtures (toilets, sinks, drains)
     - Contour detection for rectangular equipment (water heaters, tanks)
+    
+    Runs the grayscale/Canny/Hough stages on the GPU when CUDA is available.
     """
     detected = []
     
-    # Convert to grayscale
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    # Convert to grayscale, then edge detection (shared by the equipment pass)
+    if CUDA_AVAILABLE:
+        gpu_img = cv2.cuda_GpuMat()
+        gpu_img.upload(img)
+        gpu_gray = cv2.cuda.cvtColor(gpu_img, cv2.COLOR_BGR2GRAY)
+        edges = _get_cuda_filters()[0].detect(gpu_gray).download()
+    else:
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        edges = cv2.Canny(gray, 50, 150)
+    
+    # Nearly blank pages can't contain fixtures, so skip both passes for them
+    if cv2.countNonZero(edges) < Config.DETECTION_MIN_EDGE_DENSITY * edges.size:
+        return detected
     
     # Detect circular fixtures
-    detected.extend(_detect_circular_fixtures(gray))
+    circles = _find_circles_cuda(gpu_gray) if CUDA_AVAILABLE else _find_circles(gray)
+    detected.extend(_detect_circular_fixtures(circles))
     
     # Detect rectangular equipment
-    detected.extend(_detect_rectangular_equipment(gray))
+    detected.extend(_detect_rectangular_equipment(edges))
     
     # Limit results to prevent overload
     return detected[:50]
 
-def _detect_circular_fixtures(gray_img):
+def _find_circles(gray_img):
     """
-    Detect circular plumbing fixtures (toilets, sinks, drains)
+    Find circles with the Hough gradient method
     
     Args:
         gray_img: Grayscale image
     
     Returns:
-        list: Detected circular fixtures
+        ndarray: (n, 3) x, y, radius in full-resolution pixels (None if none found)
     """
-    detected = []
+    # Search a half-resolution, denoised copy - the Hough accumulator scales
+    # with image area, and the fixtures are large enough to survive pyrDown
+    small = cv2.medianBlur(cv2.pyrDown(gray_img), 5)
     
     circles = cv2.HoughCircles(
-        gray_img, 
+        small, 
         cv2.HOUGH_GRADIENT, 
         dp=1, 
-        minDist=50,
+        minDist=25,
         param1=50, 
         param2=30, 
-        minRadius=Config.DETECTION_MIN_RADIUS, 
-        maxRadius=Config.DETECTION_MAX_RADIUS
+        minRadius=Config.DETECTION_MIN_RADIUS // 2, 
+        maxRadius=Config.DETECTION_MAX_RADIUS // 2
     )
     
-    if circles is not None:
-        circles = np.uint16(np.around(circles))
-        for circle in circles[0, :]:
-            x, y, r = circle
-            detected.append({
-                'type': 'fixture_unknown',
-                'x': float(x),
-                'y': float(y),
-                'width': float(r * 2),
-                'height': float(r * 2),
-                'confidence': 0.6
-            })
-    
-    return detected
+    # Back to full-resolution coordinates
+    return None if circles is None else circles[0, :] * 2
 
-def _detect_rectangular_equipment(gray_img):
+def _find_circles_cuda(gpu_gray):
+    """GPU version of _find_circles, taking a grayscale GpuMat"""
+    _, median, hough = _get_cuda_filters()
+    small = median.apply(cv2.cuda.pyrDown(gpu_gray))
+    circles = hough.detect(small).download()
+    
+    if circles is None or not circles.size:
+        return None
+    return circles.reshape(-1, 3) * 2
+
+def _detect_circular_fixtures(circles):
     """
-    Detect rectangular equipment (water heaters, tanks, panels)
+    Detect circular plumbing fixtures (toilets, sinks, drains)
     
     Args:
-        gray_img: Grayscale image
+        circles: Circles from _find_circles/_find_circles_cuda (or None)
     
     Returns:
-        list: Detected rectangular equipment
+        list: Detected circular fixtures
     """
-    detected = []
+    if circles is None:
+        return []
+    
+    # Columns are rounded and converted to Python floats in one pass
+    return [{
+        'type': 'fixture_unknown',
+        'x': x,
+        'y': y,
+        'width': d,
+        'height': d,
+        'confidence': 0.6
+    } for x, y, d in (np.around(circles) * (1, 1, 2)).tolist()]
+
+def _detect_rectangular_equipment(edges):
+    """
+    Detect rectangular equipment (water heaters, tanks, panels)
     
-    # Edge detection
-    edges = cv2.Canny(gray_img, 50, 150)
+    Args:
+        edges: Canny edge map of the grayscale image
     
+    Returns:
+        list: Detected rectangular equipment
+    """
     # Find contours
     contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
     
-    for contour in contours:
-        x, y, w, h = cv2.boundingRect(contour)
-        area = cv2.contourArea(contour)
-        
-        # Filter by size and aspect ratio
-        if 500 < area < 5000 and 0.5 < w/h < 2.0:
-            detected.append({
-                'type': 'equipment',
-                'x': float(x),
-                'y': float(y),
-                'width': float(w),
-                'height': float(h),
-                'confidence': 0.5
-            })
-    
-    return detected
+    # Filter by size and aspect ratio (boxes come back as Python floats in one call)
+    boxes = _filter_contour_boxes(contours).astype(float).tolist()
+    return [{
+        'type': 'equipment',
+        'x': x,
+        'y': y,
+        'width': w,
+        'height': h,
+        'confidence': 0.5
+    } for x, y, w, h in boxes]
+
+def _filter_contour_boxes(contours, min_area=500, max_area=5000):
+    """
+    Bounding boxes of contours with min_area < area < max_area and
+    0.5 < w/h < 2.0, computed over all contours at once
+    
+    Same results as cv2.boundingRect/cv2.contourArea per contour, without
+    the per-contour Python calls.
+    
+    Args:
+        contours: Contours from cv2.findContours
+    
+    Returns:
+        ndarray: (n, 4) int array of x, y, w, h
+    """
+    if not contours:
+        return np.empty((0, 4), dtype=np.int64)
+    
+    # Flatten all contour points, remembering where each contour starts
+    lengths = np.fromiter((len(c) for c in contours), dtype=np.int64, count=len(contours))
+    starts = np.zeros(len(contours), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    pts = np.concatenate(contours).reshape(-1, 2).astype(np.int64)
+    xs, ys = pts[:, 0], pts[:, 1]
+    
+    # Bounding boxes (inclusive, like cv2.boundingRect)
+    x = np.minimum.reduceat(xs, starts)
+    y = np.minimum.reduceat(ys, starts)
+    w = np.maximum.reduceat(xs, starts) - x + 1
+    h = np.maximum.reduceat(ys, starts) - y + 1
+    
+    # Polygon areas via the shoelace formula (like cv2.contourArea)
+    nxt = np.arange(1, len(pts) + 1)
+    nxt[starts + lengths - 1] = starts
+    cross = xs * ys[nxt] - xs[nxt] * ys
+    area = np.abs(np.add.reduceat(cross, starts)) / 2.0
+    
+    keep = (min_area < area) & (area < max_area) & (w > 0.5 * h) & (w < 2.0 * h)
+    return np.column_stack((x, y, w, h))[keep]
 
 def classify_fixture_type(img, x, y, width, height):
     """
@@ -2,41 +2,138 @@
 PDF Processing Service
 Handles PDF to image conversion and page extraction
 """
+import glob
+import logging
+import os
+import threading
+
 import fitz  # PyMuPDF
 import cv2
 import numpy as np
 from config import Config
 
-def extract_pdf_page_as_image(pdf_path, page_num, dpi=None):
+logger = logging.getLogger(__name__)
+
+# MuPDF is not thread-safe - serialize rendering, everything after it can overlap
+_render_lock = threading.Lock()
+
+# Encoder settings per cache format: fast zlib for the lossless pages detection
+# reads, WebP (or JPEG where unsupported) for browser previews
+CACHE_ENCODE_PARAMS = {
+    'png': [cv2.IMWRITE_PNG_COMPRESSION, 1],
+    'jpg': [cv2.IMWRITE_JPEG_QUALITY, 85, cv2.IMWRITE_JPEG_OPTIMIZE, 0],
+    'webp': [cv2.IMWRITE_WEBP_QUALITY, 85],
+}
+
+def page_cache_path(drawing_id, page_num, dpi, fmt='png'):
+    """Path of the cached image for a drawing page at a given DPI"""
+    return os.path.join(Config.PAGE_CACHE_FOLDER, f"{drawing_id}_{page_num}_{dpi}.{fmt}")
+
+def _render_page(pdf_path, page_num, dpi):
+    """Rasterize a PDF page to an RGB pixmap (no alpha, so a fixed 3-channel layout)"""
+    with _render_lock:
+        doc = fitz.open(pdf_path)
+        
+        if page_num >= len(doc):
+            doc.close()
+            raise ValueError(f"Page {page_num} does not exist in PDF")
+        
+        page = doc[page_num]
+        mat = fitz.Matrix(dpi/72, dpi/72)
+        pix = page.get_pixmap(matrix=mat, alpha=False, colorspace=fitz.csRGB)
+        doc.close()
+    
+    return pix
+
+def _render_page_bgr(pdf_path, page_num, dpi):
+    """Rasterize a PDF page straight into an OpenCV (BGR) array - no PNG round-trip"""
+    pix = _render_page(pdf_path, page_num, dpi)
+    rgb = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+    return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+
+def _save_to_cache(img, path, fmt):
+    """Encode an image into the page cache"""
+    _, buffer = cv2.imencode(f".{fmt}", img, CACHE_ENCODE_PARAMS[fmt])
+    
+    # Write then rename so concurrent requests never read a partial file
+    os.makedirs(Config.PAGE_CACHE_FOLDER, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(buffer)
+    os.replace(tmp_path, path)
+
+def get_cached_page_path(pdf_path, drawing_id, page_num, dpi=None, fmt='png'):
     """
-    Convert PDF page to image for processing
+    Render a PDF page to the on-disk page cache (once) and return its path
     
     Args:
         pdf_path: Path to PDF file
+        drawing_id: Drawing the PDF belongs to (cache key)
         page_num: Page number (0-indexed)
-        dpi: Resolution for conversion (default from config)
+        dpi: Resolution for conversion (default Config.DETECTION_DPI)
+        fmt: 'png' (lossless), or 'webp'/'jpg' (previews)
     
     Returns:
-        numpy array: Image in OpenCV format (BGR)
+        str: Path to the cached image
     """
     if dpi is None:
-        dpi = Config.PDF_DPI
+        dpi = Config.DETECTION_DPI
     
-    doc = fitz.open(pdf_path)
+    path = page_cache_path(drawing_id, page_num, dpi, fmt)
+    if not os.path.exists(path):
+        _save_to_cache(_render_page_bgr(pdf_path, page_num, dpi), path, fmt)
     
-    if page_num >= len(doc):
-        doc.close()
-        raise ValueError(f"Page {page_num} does not exist in PDF")
+    return path
+
+def prerender_pages(pdf_path, drawing_id, page_count, dpi, fmt, keep_going=None):
+    """
+    Fill the page cache for every page of a drawing (run in the background
+    after upload, so opening a page finds it already rendered)
     
-    page = doc[page_num]
-    mat = fitz.Matrix(dpi/72, dpi/72)
-    pix = page.get_pixmap(matrix=mat)
-    img_data = pix.tobytes("png")
-    doc.close()
+    keep_going, if given, is called before each page; rendering stops once
+    it returns False (e.g. the drawing was deleted meanwhile).
+    """
+    try:
+        for page_num in range(page_count):
+            if keep_going is not None and not keep_going():
+                return
+            get_cached_page_path(pdf_path, drawing_id, page_num, dpi, fmt)
+    except Exception as e:
+        # The drawing may have been deleted meanwhile; pages still render on demand
+        logger.warning("Pre-rendering drawing %s stopped: %s", drawing_id, e)
+
+def clear_page_cache(drawing_id):
+    """Remove all cached page images for a drawing"""
+    for path in glob.glob(os.path.join(Config.PAGE_CACHE_FOLDER, f"{drawing_id}_*")):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def extract_pdf_page_as_image(pdf_path, page_num, dpi=None, drawing_id=None):
+    """
+    Convert PDF page to image for processing
     
-    # Convert to OpenCV format
-    nparr = np.frombuffer(img_data, np.uint8)
-    img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    Args:
+        pdf_path: Path to PDF file
+        page_num: Page number (0-indexed)
+        dpi: Resolution for conversion (default Config.DETECTION_DPI)
+        drawing_id: If given, read/fill the on-disk page cache
+    
+    Returns:
+        numpy array: Image in OpenCV format (BGR)
+    """
+    if dpi is None:
+        dpi = Config.DETECTION_DPI
+    
+    if drawing_id is not None:
+        path = page_cache_path(drawing_id, page_num, dpi)
+        if os.path.exists(path):
+            return cv2.imread(path, cv2.IMREAD_COLOR)
+    
+    img = _render_page_bgr(pdf_path, page_num, dpi)
+    if drawing_id is not None:
+        _save_to_cache(img, path, 'png')
     
     return img
 
@@ -51,10 +148,9 @@ def get_pdf_page_count(pdf_path):
         int: Number of pages
     """
     try:
-        doc = fitz.open(pdf_path)
-        page_count = len(doc)
-        doc.close()
-        return page_count
+        # page_count comes straight from the page tree - no page is loaded
+        with _render_lock, fitz.open(pdf_path) as doc:
+            return doc.page_count
     except:
         return 1
 
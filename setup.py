@@ -11,6 +11,7 @@ def create_directory_structure():
         'routes',
         'services',
         'templates',
+        'static',
         'middleware',
         'data',
         'uploads'
@@ -43,7 +44,8 @@ def main():
     print("\nNext steps:")
     print("1. Make sure all Python files are in their correct folders")
     print("2. Make sure all HTML files are in the templates/ folder")
-    print("3. Run: python app.py")
+    print("3. Initialize the database: flask --app app init-db")
+    print("4. Run: python app.py")
     print("=" * 60)
 
 if __name__ == '__main__':
@@ -0,0 +1,328 @@
+let companies = [];
+let users = [];
+let modalCompanies = [];
+
+// Tables are fetched a page at a time
+const PAGE_SIZE = 50;
+let companiesOffset = 0;
+let usersOffset = 0;
+
+// Parse markup into a fragment (<template> parses table rows/options
+// in place and never runs scripts)
+function parseHTML(html) {
+    const template = document.createElement('template');
+    template.innerHTML = html;
+    return template.content;
+}
+
+// Swap an element's children for parsed markup in one DOM insertion
+function renderHTML(el, html) {
+    el.replaceChildren(parseHTML(html));
+}
+
+// Compile a <template> into a row builder. The template is looked up and
+// its [data-field] parts located once; each call clones it and fills those
+// parts as plain text - no HTML parsing per row, and names can't inject markup
+function compileTemplate(id) {
+    const root = document.getElementById(id).content.firstElementChild;
+    const fields = [...root.querySelectorAll('[data-field]')].map(part => {
+        const path = [];
+        for (let el = part; el !== root; el = el.parentElement) {
+            path.unshift([...el.parentElement.children].indexOf(el));
+        }
+        return [part.dataset.field, path];
+    });
+    
+    return values => {
+        const node = root.cloneNode(true);
+        for (const [field, path] of fields) {
+            let part = node;
+            for (const index of path) part = part.children[index];
+            part.textContent = values[field];
+        }
+        return node;
+    };
+}
+
+// Long lists: render the first chunk of rows now, append the rest
+// a chunk at a time while the browser is idle
+const RENDER_CHUNK = 50;
+const requestIdle = window.requestIdleCallback || (cb => setTimeout(cb, 1));
+const cancelIdle = window.cancelIdleCallback || clearTimeout;
+
+function renderRowsDeferred(el, items, buildRow) {
+    cancelDeferredRender(el);
+    el.replaceChildren(...items.slice(0, RENDER_CHUNK).map(buildRow));
+    el.renderCursor = RENDER_CHUNK;
+
+    const appendChunk = () => {
+        el.renderJob = null;
+        if (el.renderCursor >= items.length) return;
+        el.append(...items.slice(el.renderCursor, el.renderCursor + RENDER_CHUNK).map(buildRow));
+        el.renderCursor += RENDER_CHUNK;
+        el.renderJob = requestIdle(appendChunk);
+    };
+    el.renderJob = requestIdle(appendChunk);
+}
+
+function cancelDeferredRender(el) {
+    if (el.renderJob) {
+        cancelIdle(el.renderJob);
+        el.renderJob = null;
+    }
+}
+
+// Conditional GET for JSON the server tags with an ETag - a 304 reuses
+// the body parsed last time
+const jsonCache = new Map();
+
+async function cachedFetch(url) {
+    const cached = jsonCache.get(url);
+    const response = await fetch(url, cached ? { headers: { 'If-None-Match': cached.etag } } : {});
+    if (response.status === 304 && cached) return cached.body;
+
+    const body = await response.json();
+    const etag = response.headers.get('ETag');
+    if (response.ok && etag) jsonCache.set(url, { etag, body });
+    return body;
+}
+
+// Prev/next controls for a paged table; loadPage(offset) fetches a page
+function renderPager(pagerId, offset, total, loadPage) {
+    const pager = document.getElementById(pagerId);
+    if (total <= PAGE_SIZE) {
+        pager.replaceChildren();
+        return;
+    }
+
+    renderHTML(pager, `
+        <button class="btn-secondary" ${offset === 0 ? 'disabled' : ''}>&lsaquo; Prev</button>
+        <span>${offset + 1}&ndash;${Math.min(offset + PAGE_SIZE, total)} of ${total}</span>
+        <button class="btn-secondary" ${offset + PAGE_SIZE >= total ? 'disabled' : ''}>Next &rsaquo;</button>
+    `);
+    const [prev, next] = pager.querySelectorAll('button');
+    prev.onclick = () => loadPage(offset - PAGE_SIZE);
+    next.onclick = () => loadPage(offset + PAGE_SIZE);
+}
+
+// Tab loads: wait for the user to settle on a tab, and let only the
+// most recent table load finish
+const debounce = (fn, ms) => {
+    let timer;
+    return (...args) => {
+        clearTimeout(timer);
+        timer = setTimeout(() => fn(...args), ms);
+    };
+};
+const loadTab = debounce(tab => tab === 'companies' ? loadCompanies() : loadUsers(), 120);
+
+let loadController = null;
+
+function startTableLoad() {
+    if (loadController) loadController.abort();
+    loadController = new AbortController();
+    return loadController.signal;
+}
+
+async function showTab(tab) {
+    document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
+    event.target.classList.add('active');
+
+    // Stop filling the table we're leaving
+    cancelDeferredRender(document.getElementById('companiesTable'));
+    cancelDeferredRender(document.getElementById('usersTable'));
+
+    document.getElementById('companiesTab').style.display = tab === 'companies' ? 'block' : 'none';
+    document.getElementById('usersTab').style.display = tab === 'users' ? 'block' : 'none';
+
+    loadTab(tab);
+}
+
+// Row builders, compiled once from the <template>s in admin.html
+const companyRow = compileTemplate('companyRow');
+const userRow = compileTemplate('userRow');
+const companyOption = compileTemplate('companyOption');
+
+async function loadCompanies(offset = companiesOffset) {
+    companiesOffset = Math.max(0, offset);
+    const signal = startTableLoad();
+    let total;
+    try {
+        const response = await fetch(`/api/admin/companies?limit=${PAGE_SIZE}&offset=${companiesOffset}`, { signal });
+        companies = await response.json();
+        total = parseInt(response.headers.get('X-Total-Count'), 10) || 0;
+    } catch (error) {
+        if (error.name === 'AbortError') return;
+        throw error;
+    }
+
+    // Step back if the last row on this page was just deleted
+    if (companies.length === 0 && companiesOffset > 0) {
+        return loadCompanies(companiesOffset - PAGE_SIZE);
+    }
+
+    const table = document.getElementById('companiesTable');
+    renderRowsDeferred(table, companies, c => {
+        const row = companyRow({
+            name: c.name,
+            address: c.address || '-',
+            phone: c.phone || '-',
+            created: new Date(c.created_at).toLocaleDateString()
+        });
+        row.dataset.id = c.id;
+        return row;
+    });
+    renderPager('companiesPager', companiesOffset, total, loadCompanies);
+}
+
+async function loadUsers(offset = usersOffset) {
+    usersOffset = Math.max(0, offset);
+    const signal = startTableLoad();
+    let total;
+    try {
+        const response = await fetch(`/api/admin/users?limit=${PAGE_SIZE}&offset=${usersOffset}`, { signal });
+        users = await response.json();
+        total = parseInt(response.headers.get('X-Total-Count'), 10) || 0;
+    } catch (error) {
+        if (error.name === 'AbortError') return;
+        throw error;
+    }
+
+    // Step back if the last row on this page was just deleted
+    if (users.length === 0 && usersOffset > 0) {
+        return loadUsers(usersOffset - PAGE_SIZE);
+    }
+
+    const table = document.getElementById('usersTable');
+    renderRowsDeferred(table, users, u => {
+        const row = userRow({
+            email: u.email,
+            name: `${u.first_name || ''} ${u.last_name || ''}`,
+            companies: u.companies || 'None',
+            admin: u.is_admin ? '✓' : ''
+        });
+        row.dataset.id = u.id;
+        return row;
+    });
+    renderPager('usersPager', usersOffset, total, loadUsers);
+}
+
+function showNewCompanyModal() {
+    document.getElementById('companyModal').style.display = 'block';
+}
+
+async function showNewUserModal() {
+    // Every company can be assigned, not just the page on screen
+    modalCompanies = await cachedFetch('/api/admin/companies');
+    const checkboxes = document.getElementById('companyCheckboxes');
+    checkboxes.replaceChildren(...modalCompanies.map(c => {
+        const option = companyOption({ name: c.name });
+        const checkbox = option.querySelector('input');
+        checkbox.id = `company_${c.id}`;
+        checkbox.value = c.id;
+        option.querySelector('label').htmlFor = checkbox.id;
+        return option;
+    }));
+    document.getElementById('userModal').style.display = 'block';
+}
+
+function closeModals() {
+    document.getElementById('companyModal').style.display = 'none';
+    document.getElementById('userModal').style.display = 'none';
+    document.querySelectorAll('input[type="text"], input[type="email"], input[type="password"]').forEach(i => i.value = '');
+    document.querySelectorAll('input[type="checkbox"]').forEach(i => i.checked = false);
+}
+
+async function createCompany() {
+    const name = document.getElementById('companyName').value;
+    if (!name) return alert('Company name is required');
+
+    const response = await fetch('/api/admin/companies', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+            name,
+            address: document.getElementById('companyAddress').value,
+            phone: document.getElementById('companyPhone').value
+        })
+    });
+
+    if (response.ok) {
+        closeModals();
+        loadCompanies();
+    } else {
+        const data = await response.json();
+        alert(data.error || 'Failed to create company');
+    }
+}
+
+async function createUser() {
+    const email = document.getElementById('userEmail').value;
+    const password = document.getElementById('userPassword').value;
+
+    if (!email || !password) return alert('Email and password are required');
+
+    const companyIds = [];
+    modalCompanies.forEach(c => {
+        if (document.getElementById('company_' + c.id).checked) {
+            companyIds.push(c.id);
+        }
+    });
+
+    const response = await fetch('/api/admin/users', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+            email,
+            password,
+            first_name: document.getElementById('userFirstName').value,
+            last_name: document.getElementById('userLastName').value,
+            is_admin: document.getElementById('userIsAdmin').checked,
+            company_ids: companyIds
+        })
+    });
+
+    if (response.ok) {
+        closeModals();
+        loadUsers();
+    } else {
+        const data = await response.json();
+        alert(data.error || 'Failed to create user');
+    }
+}
+
+async function deleteCompany(id) {
+    if (!confirm('Delete this company? All projects and data will be permanently deleted!')) return;
+
+    await fetch('/api/admin/companies/' + id, { method: 'DELETE' });
+    loadCompanies();
+}
+
+async function deleteUser(id) {
+    if (!confirm('Delete this user?')) return;
+
+    const response = await fetch('/api/admin/users/' + id, { method: 'DELETE' });
+    if (response.ok) {
+        loadUsers();
+    } else {
+        const data = await response.json();
+        alert(data.error || 'Failed to delete user');
+    }
+}
+
+async function logout() {
+    await fetch('/api/auth/logout', { method: 'POST' });
+    window.location.href = '/';
+}
+
+// One delegated listener per table instead of an onclick per row
+function onRowAction(tableId, action, handler) {
+    document.getElementById(tableId).addEventListener('click', event => {
+        const button = event.target.closest(`[data-action="${action}"]`);
+        if (button) handler(parseInt(button.closest('tr').dataset.id, 10));
+    });
+}
+onRowAction('companiesTable', 'delete', deleteCompany);
+onRowAction('usersTable', 'delete', deleteUser);
+
+loadCompanies();
@@ -0,0 +1,1611 @@
+// Parse markup into a fragment (<template> parses table rows/options
+// in place and never runs scripts)
+function parseHTML(html) {
+    const template = document.createElement('template');
+    template.innerHTML = html;
+    return template.content;
+}
+
+// Swap an element's children for parsed markup in one DOM insertion
+function renderHTML(el, html) {
+    el.replaceChildren(parseHTML(html));
+}
+
+// Conditional GET for JSON the server tags with an ETag - a 304 reuses
+// the body parsed last time
+const jsonCache = new Map();
+
+async function cachedFetch(url) {
+    const cached = jsonCache.get(url);
+    const response = await fetch(url, cached ? { headers: { 'If-None-Match': cached.etag } } : {});
+    if (response.status === 304 && cached) return cached.body;
+
+    const body = await response.json();
+    const etag = response.headers.get('ETag');
+    if (response.ok && etag) jsonCache.set(url, { etag, body });
+    return body;
+}
+
+// Compile a <template> into a row builder. The template is looked up and
+// its [data-field] parts located once; each call clones it and fills those
+// parts as plain text - no HTML parsing per row, and names can't inject markup
+function compileTemplate(id) {
+    const root = document.getElementById(id).content.firstElementChild;
+    const fields = [...root.querySelectorAll('[data-field]')].map(part => {
+        const path = [];
+        for (let el = part; el !== root; el = el.parentElement) {
+            path.unshift([...el.parentElement.children].indexOf(el));
+        }
+        return [part.dataset.field, path];
+    });
+    
+    return values => {
+        const node = root.cloneNode(true);
+        for (const [field, path] of fields) {
+            let part = node;
+            for (const index of path) part = part.children[index];
+            part.textContent = values[field];
+        }
+        return node;
+    };
+}
+
+// Long lists: render the first chunk of rows now, append the rest
+// a chunk at a time while the browser is idle
+const RENDER_CHUNK = 50;
+const requestIdle = window.requestIdleCallback || (cb => setTimeout(cb, 1));
+const cancelIdle = window.cancelIdleCallback || clearTimeout;
+
+function renderRowsDeferred(el, items, buildRow) {
+    cancelDeferredRender(el);
+    el.replaceChildren(...items.slice(0, RENDER_CHUNK).map(buildRow));
+    el.renderCursor = RENDER_CHUNK;
+
+    const appendChunk = () => {
+        el.renderJob = null;
+        if (el.renderCursor >= items.length) return;
+        el.append(...items.slice(el.renderCursor, el.renderCursor + RENDER_CHUNK).map(buildRow));
+        el.renderCursor += RENDER_CHUNK;
+        el.renderJob = requestIdle(appendChunk);
+    };
+    el.renderJob = requestIdle(appendChunk);
+}
+
+function cancelDeferredRender(el) {
+    if (el.renderJob) {
+        cancelIdle(el.renderJob);
+        el.renderJob = null;
+    }
+}
+
+// Project list row builder, compiled once from its <template> in main.html
+const projectItem = compileTemplate('projectItem');
+
+// State variables
+let currentProject = null;
+let currentDrawing = null;
+let currentPage = 0;
+let allDrawings = [];
+let wbsCategories = [];
+let currentWBSCategory = null;
+
+// Scale variables
+let commonScales = [];
+let customScales = [];
+let currentPageScale = null;
+let scaleZones = [];
+
+// Canvas variables
+const canvas = document.getElementById('canvas');
+const ctx = canvas.getContext('2d');
+let zoomLevel = 1.0;
+let panX = 0;
+let panY = 0;
+let isPanning = false;
+let lastMouseX = 0;
+let lastMouseY = 0;
+let currentImage = null;
+let currentDetectedItems = [];
+let pageLoadToken = 0; // bumped per page load; stale responses are dropped
+let pendingImage = null;
+let redrawQueued = false;
+let fullRedraw = false;
+let dirtyRegions = []; // image-space rects to repaint when no full redraw is due
+let drawnItems = new Map(); // detected items as last painted, by id
+
+// Calibration variables
+let calibrationPoints = [];
+const calibrationCanvas = document.getElementById('calibrationCanvas');
+const calibrationCtx = calibrationCanvas ? calibrationCanvas.getContext('2d') : null;
+
+// Scale zone drawing variables
+let isDrawingZone = false;
+let zoneStartX = 0;
+let zoneStartY = 0;
+let currentZoneRect = null;
+let pendingZone = null; // Store zone coordinates while showing modal
+let isCreatingZone = false; // Prevent double creation
+
+// Initialize
+initializePage();
+
+async function initializePage() {
+    try {
+        document.getElementById('projectList').addEventListener('click', handleProjectListClick);
+
+        // Independent requests - fetch them concurrently
+        await Promise.all([loadUserInfo(), loadProjects(), loadCommonScales()]);
+
+        canvas.addEventListener('wheel', handleZoom, { passive: false });
+        canvas.addEventListener('mousedown', handleMouseDown);
+        canvas.addEventListener('mousemove', handleMouseMove);
+        canvas.addEventListener('mouseup', handleMouseUp);
+        canvas.addEventListener('mouseleave', handleMouseUp);
+        document.addEventListener('keydown', handleKeyboard);
+        document.addEventListener('click', hideContextMenu);
+
+        if (calibrationCanvas) {
+            calibrationCanvas.addEventListener('click', handleCalibrationClick);
+        }
+    } catch (error) {
+        console.error('Initialization error:', error);
+    }
+}
+
+async function loadUserInfo() {
+    const [user, data] = await Promise.all([
+        cachedFetch('/api/auth/me'),
+        fetch('/api/auth/current-company').then(r => r.json())
+    ]);
+    document.getElementById('currentUserEmail').textContent = user.email;
+
+    if (data.company) {
+        document.getElementById('currentCompanyName').textContent = data.company.name;
+    }
+}
+
+async function loadProjects() {
+    const projects = await cachedFetch('/api/projects');
+    const list = document.getElementById('projectList');
+
+    if (projects.length === 0) {
+        cancelDeferredRender(list);
+        list.innerHTML = '<p style="color: #bdc3c7; padding: 10px;">No projects yet</p>';
+        return;
+    }
+
+    renderRowsDeferred(list, projects, p => {
+        const item = projectItem({ name: p.name, description: p.description || '' });
+        item.dataset.projectId = p.id;
+        return item;
+    });
+}
+
+// One delegated listener for every project row and its buttons
+function handleProjectListClick(event) {
+    const item = event.target.closest('.project-item');
+    if (!item) return;
+
+    const projectId = parseInt(item.dataset.projectId, 10);
+    const action = event.target.closest('[data-action]')?.dataset.action;
+    if (action === 'rename') {
+        renameProject(projectId, item.querySelector('strong').textContent);
+    } else if (action === 'delete') {
+        deleteProjectConfirm(projectId);
+    } else if (!event.target.closest('.project-actions')) {
+        selectProject(projectId);
+    }
+}
+
+// Only the latest project selection is applied; repeat clicks on the
+// project that is already loading are ignored
+let projectController = null;
+let loadingProjectId = null;
+
+async function selectProject(projectId) {
+    if (projectId === loadingProjectId) return;
+    if (projectController) projectController.abort();
+    const controller = projectController = new AbortController();
+    loadingProjectId = projectId;
+
+    let data;
+    try {
+        const response = await fetch(`/api/projects/${projectId}`, { signal: controller.signal });
+        data = await response.json();
+    } catch (error) {
+        if (error.name === 'AbortError') return;
+        throw error;
+    } finally {
+        if (projectController === controller) loadingProjectId = null;
+    }
+
+    currentProject = data.project;
+    allDrawings = data.drawings;
+    document.getElementById('currentProject').textContent = currentProject.name;
+
+    await loadWBSCategories();
+    if (controller.signal.aborted) return;
+
+    const drawingSelect = document.getElementById('drawingSelect');
+    if (data.drawings.length === 0) {
+        drawingSelect.innerHTML = '<option value="">No drawings</option>';
+    } else {
+        drawingSelect.replaceChildren(new Option('Select a drawing...', ''),
+            ...data.drawings.map(d => new Option(d.name, d.id)));
+    }
+
+    document.querySelectorAll('.project-item').forEach(el => {
+        el.classList.remove('active');
+        if (parseInt(el.getAttribute('data-project-id')) === projectId) {
+            el.classList.add('active');
+        }
+    });
+}
+
+async function renameProject(projectId, currentName) {
+    const newName = prompt('Enter new project name:', currentName);
+    if (!newName || newName === currentName) return;
+
+    await fetch(`/api/projects/${projectId}`, {
+        method: 'PUT',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ name: newName })
+    });
+
+    await loadProjects();
+    if (currentProject && currentProject.id === projectId) {
+        currentProject.name = newName;
+        document.getElementById('currentProject').textContent = newName;
+    }
+}
+
+async function deleteProjectConfirm(projectId) {
+    if (!confirm('Delete this project? All drawings and data will be permanently deleted!')) return;
+
+    await fetch(`/api/projects/${projectId}`, { method: 'DELETE' });
+
+    if (currentProject && currentProject.id === projectId) {
+        currentProject = null;
+        currentDrawing = null;
+        document.getElementById('currentProject').textContent = 'No project selected';
+        document.getElementById('drawingSelect').innerHTML = '<option value="">No drawings</option>';
+        document.getElementById('canvasInstructions').style.display = 'block';
+        canvas.style.display = 'none';
+    }
+
+    await loadProjects();
+}
+
+async function loadWBSCategories() {
+    if (!currentProject) return;
+
+    const response = await fetch(`/api/projects/${currentProject.id}/wbs`);
+    wbsCategories = await response.json();
+
+    const wbsSelect = document.getElementById('wbsSelect');
+    wbsSelect.innerHTML = '<option value="">Select WBS...</option>';
+
+    function addOptions(categories, level = 0) {
+        categories.forEach(cat => {
+            const indent = '\u00A0\u00A0'.repeat(level * 2);
+            const prefix = level > 0 ? '└ ' : '';
+            const option = document.createElement('option');
+            option.value = cat.id;
+            option.textContent = `${indent}${prefix}${cat.name}`;
+            wbsSelect.appendChild(option);
+
+            const children = wbsCategories.filter(c => c.parent_id === cat.id);
+            if (children.length > 0) {
+                addOptions(children, level + 1);
+            }
+        });
+    }
+
+    const topLevel = wbsCategories.filter(c => c.parent_id === null);
+    addOptions(topLevel);
+}
+
+async function handleWBSChange() {
+    const wbsSelect = document.getElementById('wbsSelect');
+    const newCategoryId = parseInt(wbsSelect.value) || null;
+
+    if (!currentDrawing || currentDetectedItems.length === 0) {
+        currentWBSCategory = newCategoryId;
+        return;
+    }
+
+    if (currentWBSCategory !== newCategoryId && newCategoryId !== null) {
+        const categoryName = wbsSelect.options[wbsSelect.selectedIndex].text.trim();
+
+        if (!confirm(`Assign all ${currentDetectedItems.length} items to "${categoryName}"?`)) {
+            wbsSelect.value = currentWBSCategory || '';
+            return;
+        }
+
+        const itemIds = currentDetectedItems.map(item => item.id);
+        await fetch('/api/items/bulk-update-wbs', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ item_ids: itemIds, wbs_category_id: newCategoryId })
+        });
+
+        currentWBSCategory = newCategoryId;
+        await loadTakeoff();
+        showSuccessToast(`✓ ${currentDetectedItems.length} items assigned`);
+    } else {
+        currentWBSCategory = newCategoryId;
+    }
+}
+
+// Scale management functions
+async function loadCommonScales() {
+    const response = await fetch('/api/scales/common');
+    commonScales = await response.json();
+}
+
+async function loadScales() {
+    if (!currentProject || !currentDrawing) return;
+
+    try {
+        // Custom scales for this project and the scale for the current
+        // page of the current drawing, fetched concurrently
+        const [customData, pageScaleData] = await Promise.all([
+            fetch(`/api/projects/${currentProject.id}/scales/custom`).then(r => r.json()),
+            fetch(`/api/drawings/${currentDrawing}/page/${currentPage}/scale`).then(r => r.json())
+        ]);
+        customScales = customData;
+
+        console.log('Loading scale for drawing:', currentDrawing, 'page:', currentPage);
+        console.log('Received scale data:', pageScaleData);
+
+        // Check if we got actual scale data with scale_id
+        if (pageScaleData && Object.keys(pageScaleData).length > 0 && pageScaleData.scale_id) {
+            currentPageScale = pageScaleData;
+            console.log('Set current scale to:', currentPageScale.scale_name, '(ID:', currentPageScale.scale_id, ')');
+        } else {
+            currentPageScale = null;
+            console.log('No scale set for this page');
+        }
+
+        updateScaleDropdown();
+        await loadScaleZones();
+    } catch (error) {
+        console.error('Error loading scales:', error);
+    }
+}
+
+function updateScaleDropdown() {
+    const scaleSelect = document.getElementById('scaleSelect');
+    scaleSelect.innerHTML = '<option value="">No scale set</option>';
+
+    const archGroup = document.createElement('optgroup');
+    archGroup.label = 'Architectural';
+    commonScales.filter(s => s.type === 'architectural').forEach(scale => {
+        const option = document.createElement('option');
+        option.value = scale.id;
+        option.textContent = scale.name;
+        archGroup.appendChild(option);
+    });
+    scaleSelect.appendChild(archGroup);
+
+    const engGroup = document.createElement('optgroup');
+    engGroup.label = 'Engineering';
+    commonScales.filter(s => s.type === 'engineering').forEach(scale => {
+        const option = document.createElement('option');
+        option.value = scale.id;
+        option.textContent = scale.name;
+        engGroup.appendChild(option);
+    });
+    scaleSelect.appendChild(engGroup);
+
+    const metricGroup = document.createElement('optgroup');
+    metricGroup.label = 'Metric';
+    commonScales.filter(s => s.type === 'metric').forEach(scale => {
+        const option = document.createElement('option');
+        option.value = scale.id;
+        option.textContent = scale.name;
+        metricGroup.appendChild(option);
+    });
+    scaleSelect.appendChild(metricGroup);
+
+    if (customScales.length > 0) {
+        const customGroup = document.createElement('optgroup');
+        customGroup.label = 'Custom Scales';
+        customScales.forEach(scale => {
+            const option = document.createElement('option');
+            option.value = `custom_${scale.id}`;
+            option.textContent = scale.name;
+            customGroup.appendChild(option);
+        });
+        scaleSelect.appendChild(customGroup);
+    }
+
+    // Set current scale value - this is the critical part
+    if (currentPageScale && currentPageScale.scale_id) {
+        scaleSelect.value = currentPageScale.scale_id;
+        console.log('Setting dropdown to:', currentPageScale.scale_id, '- found option:', scaleSelect.value === currentPageScale.scale_id);
+
+        // Double-check the value was set correctly
+        if (scaleSelect.value !== currentPageScale.scale_id) {
+            console.error('WARNING: Failed to set scale dropdown! Wanted:', currentPageScale.scale_id, 'but got:', scaleSelect.value);
+        }
+    } else {
+        scaleSelect.value = '';
+        console.log('Setting dropdown to empty (no scale)');
+    }
+}
+
+async function handleScaleChange() {
+    if (!currentDrawing) return;
+
+    const scaleSelect = document.getElementById('scaleSelect');
+    const scaleId = scaleSelect.value;
+
+    if (!scaleId) {
+        await setPageScale(null, null, null);
+        return;
+    }
+
+    let scaleName = '';
+    let pixelsPerUnit = null;
+
+    if (scaleId.startsWith('custom_')) {
+        const customId = parseInt(scaleId.replace('custom_', ''));
+        const custom = customScales.find(s => s.id === customId);
+        if (custom) {
+            scaleName = custom.name;
+            pixelsPerUnit = custom.pixels_per_unit;
+        }
+    } else {
+        const common = commonScales.find(s => s.id === scaleId);
+        if (common) scaleName = common.name;
+    }
+
+    await setPageScale(scaleId, scaleName, pixelsPerUnit);
+    showSuccessToast(`✓ Scale set: ${scaleName}`);
+}
+
+async function setPageScale(scaleId, scaleName, pixelsPerUnit) {
+    try {
+        console.log('Saving scale for drawing:', currentDrawing, 'page:', currentPage);
+        console.log('Scale ID:', scaleId, 'Name:', scaleName);
+
+        const response = await fetch(`/api/drawings/${currentDrawing}/page/${currentPage}/scale`, {
+            method: 'PUT',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ 
+                scale_id: scaleId, 
+                scale_name: scaleName, 
+                pixels_per_unit: pixelsPerUnit 
+            })
+        });
+
+        if (!response.ok) {
+            throw new Error('Failed to save scale');
+        }
+
+        const result = await response.json();
+        console.log('Scale saved successfully:', result);
+
+        // Reload scales to update current state
+        await loadScales();
+        updateDetectionInfo();
+    } catch (error) {
+        console.error('Error setting scale:', error);
+        alert('Error saving scale to database');
+    }
+}
+
+function showCalibrateModal() {
+    if (!currentDrawing) {
+        alert('Please select a drawing first');
+        return;
+    }
+
+    document.getElementById('calibrateModal').style.display = 'block';
+    calibrationPoints = [];
+
+    if (currentImage && calibrationCanvas) {
+        const scale = Math.min(400 / currentImage.width, 300 / currentImage.height);
+        const w = currentImage.width * scale;
+        const h = currentImage.height * scale;
+        calibrationCanvas.width = w;
+        calibrationCanvas.height = h;
+        calibrationCtx.drawImage(currentImage, 0, 0, w, h);
+    }
+}
+
+function handleCalibrationClick(event) {
+    const rect = calibrationCanvas.getBoundingClientRect();
+    const x = event.clientX - rect.left;
+    const y = event.clientY - rect.top;
+
+    calibrationPoints.push({ x, y });
+
+    calibrationCtx.fillStyle = '#e74c3c';
+    calibrationCtx.beginPath();
+    calibrationCtx.arc(x, y, 5, 0, 2 * Math.PI);
+    calibrationCtx.fill();
+
+    if (calibrationPoints.length === 2) {
+        calibrationCtx.strokeStyle = '#e74c3c';
+        calibrationCtx.lineWidth = 2;
+        calibrationCtx.beginPath();
+        calibrationCtx.moveTo(calibrationPoints[0].x, calibrationPoints[0].y);
+        calibrationCtx.lineTo(calibrationPoints[1].x, calibrationPoints[1].y);
+        calibrationCtx.stroke();
+
+        const dx = calibrationPoints[1].x - calibrationPoints[0].x;
+        const dy = calibrationPoints[1].y - calibrationPoints[0].y;
+        const pixelDistance = Math.sqrt(dx * dx + dy * dy);
+
+        document.getElementById('calibrationResult').style.display = 'block';
+        document.getElementById('calibrationResultText').textContent = 
+            `Measured ${pixelDistance.toFixed(2)} pixels. Enter the known distance.`;
+    } else if (calibrationPoints.length > 2) {
+        resetCalibration();
+        handleCalibrationClick(event);
+    }
+}
+
+function resetCalibration() {
+    calibrationPoints = [];
+    document.getElementById('calibrationResult').style.display = 'none';
+    if (currentImage && calibrationCanvas) {
+        const scale = Math.min(400 / currentImage.width, 300 / currentImage.height);
+        const w = currentImage.width * scale;
+        const h = currentImage.height * scale;
+        calibrationCanvas.width = w;
+        calibrationCanvas.height = h;
+        calibrationCtx.drawImage(currentImage, 0, 0, w, h);
+    }
+}
+
+async function applyCalibration() {
+    if (calibrationPoints.length !== 2) {
+        alert('Please draw a line first');
+        return;
+    }
+
+    const knownDistance = parseFloat(document.getElementById('knownDistance').value);
+    if (!knownDistance || knownDistance <= 0) {
+        alert('Please enter a valid distance');
+        return;
+    }
+
+    const unit = document.getElementById('distanceUnit').value;
+    const scaleName = document.getElementById('scaleName').value;
+
+    const dx = calibrationPoints[1].x - calibrationPoints[0].x;
+    const dy = calibrationPoints[1].y - calibrationPoints[0].y;
+    const pixelDistance = Math.sqrt(dx * dx + dy * dy);
+
+    const canvasScale = currentImage.width / calibrationCanvas.width;
+    const actualPixelDistance = pixelDistance * canvasScale;
+
+    const response = await fetch(`/api/drawings/${currentDrawing}/calibrate`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+            page_number: currentPage,
+            pixel_distance: actualPixelDistance,
+            real_distance: knownDistance,
+            unit: unit,
+            name: scaleName || `Custom ${unit} scale`
+        })
+    });
+
+    const result = await response.json();
+    await loadScales();
+    closeModals();
+    showSuccessToast('✓ Scale calibrated!');
+
+    if (result.scale_id) {
+        document.getElementById('scaleSelect').value = `custom_${result.scale_id}`;
+        await handleScaleChange();
+    }
+}
+
+function toggleScaleZoneMode() {
+    if (!currentDrawing) {
+        alert('Please select a drawing first');
+        return;
+    }
+
+    isDrawingZone = !isDrawingZone;
+    const btn = document.getElementById('scaleZoneBtn');
+    const info = document.getElementById('drawingModeInfo');
+
+    if (isDrawingZone) {
+        btn.style.background = '#e74c3c';
+        info.style.display = 'block';
+        canvas.style.cursor = 'crosshair';
+    } else {
+        btn.style.background = '#95a5a6';
+        info.style.display = 'none';
+        canvas.style.cursor = 'default';
+    }
+}
+
+async function loadScaleZones() {
+    if (!currentDrawing) return;
+
+    const response = await fetch(`/api/drawings/${currentDrawing}/page/${currentPage}/scale-zones`);
+    scaleZones = await response.json();
+    redrawCanvas();
+    updateDetectionInfo();
+}
+
+async function showScaleZonesModal() {
+    if (!currentDrawing) {
+        alert('Please select a drawing first');
+        return;
+    }
+
+    await loadScaleZones();
+
+    const zonesList = document.getElementById('zonesList');
+    if (scaleZones.length === 0) {
+        zonesList.innerHTML = '<p style="color: #95a5a6;">No zones defined</p>';
+    } else {
+        zonesList.innerHTML = scaleZones.map(zone => `
+            <div class="zone-list-item">
+                <div>
+                    <strong>${zone.name}</strong><br>
+                    <span style="font-size: 12px; color: #7f8c8d;">
+                        Scale: ${zone.scale_name || 'None set'}
+                    </span>
+                </div>
+                <div style="display: flex; gap: 5px;">
+                    <button class="small" onclick="editZoneScale(${zone.id}, '${zone.name.replace(/'/g, "\\'")}')">Change Scale</button>
+                    <button class="small danger" onclick="deleteScaleZone(${zone.id})">Delete</button>
+                </div>
+            </div>
+        `).join('');
+    }
+
+    document.getElementById('scaleZonesModal').style.display = 'block';
+}
+
+async function editZoneScale(zoneId, zoneName) {
+    const zone = scaleZones.find(z => z.id === zoneId);
+    if (!zone) return;
+
+    // Build scale options
+    let options = '<option value="">No scale</option>';
+
+    options += '<optgroup label="Architectural">';
+    commonScales.filter(s => s.type === 'architectural').forEach(scale => {
+        const selected = zone.scale_id === scale.id ? 'selected' : '';
+        options += `<option value="${scale.id}" ${selected}>${scale.name}</option>`;
+    });
+    options += '</optgroup>';
+
+    options += '<optgroup label="Engineering">';
+    commonScales.filter(s => s.type === 'engineering').forEach(scale => {
+        const selected = zone.scale_id === scale.id ? 'selected' : '';
+        options += `<option value="${scale.id}" ${selected}>${scale.name}</option>`;
+    });
+    options += '</optgroup>';
+
+    options += '<optgroup label="Metric">';
+    commonScales.filter(s => s.type === 'metric').forEach(scale => {
+        const selected = zone.scale_id === scale.id ? 'selected' : '';
+        options += `<option value="${scale.id}" ${selected}>${scale.name}</option>`;
+    });
+    options += '</optgroup>';
+
+    if (customScales.length > 0) {
+        options += '<optgroup label="Custom Scales">';
+        customScales.forEach(scale => {
+            const scaleValue = `custom_${scale.id}`;
+            const selected = zone.scale_id === scaleValue ? 'selected' : '';
+            options += `<option value="${scaleValue}" ${selected}>${scale.name}</option>`;
+        });
+        options += '</optgroup>';
+    }
+
+    const selectHtml = `
+        <div style="margin: 15px 0;">
+            <label style="display: block; margin-bottom: 5px;">Select new scale for "${zoneName}":</label>
+            <select id="tempZoneScaleSelect" style="width: 100%; padding: 8px;">
+                ${options}
+            </select>
+        </div>
+        <div style="display: flex; gap: 10px; margin-top: 10px;">
+            <button onclick="saveZoneScale(${zoneId})">Save</button>
+            <button onclick="closeModals(); showScaleZonesModal();" class="secondary">Cancel</button>
+        </div>
+    `;
+
+    const zonesList = document.getElementById('zonesList');
+    zonesList.innerHTML = selectHtml;
+}
+
+async function saveZoneScale(zoneId) {
+    const selectedScale = document.getElementById('tempZoneScaleSelect').value;
+
+    let zoneScaleId = selectedScale || null;
+    let zoneScaleName = null;
+    let zonePixelsPerUnit = null;
+
+    if (selectedScale) {
+        if (selectedScale.startsWith('custom_')) {
+            const customId = parseInt(selectedScale.replace('custom_', ''));
+            const custom = customScales.find(s => s.id === customId);
+            if (custom) {
+                zoneScaleName = custom.name;
+                zonePixelsPerUnit = custom.pixels_per_unit;
+            }
+        } else {
+            const common = commonScales.find(s => s.id === selectedScale);
+            if (common) {
+                zoneScaleName = common.name;
+            }
+        }
+    }
+
+    try {
+        await fetch(`/api/scale-zones/${zoneId}`, {
+            method: 'PUT',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                scale_id: zoneScaleId,
+                scale_name: zoneScaleName,
+                pixels_per_unit: zonePixelsPerUnit
+            })
+        });
+
+        await loadScaleZones();
+        showSuccessToast('✓ Zone scale updated');
+        closeModals();
+        showScaleZonesModal();
+    } catch (error) {
+        console.error('Error updating zone scale:', error);
+        alert('Error updating zone scale');
+    }
+}
+
+async function deleteScaleZone(zoneId) {
+    if (!confirm('Delete this zone?')) return;
+
+    await fetch(`/api/scale-zones/${zoneId}`, { method: 'DELETE' });
+    await loadScaleZones();
+    showScaleZonesModal();
+}
+
+// Drawing context menu
+function showDrawingContextMenu(event) {
+    event.preventDefault();
+
+    const drawingSelect = document.getElementById('drawingSelect');
+    if (!drawingSelect.value) return;
+
+    const contextMenu = document.getElementById('contextMenu');
+    contextMenu.style.display = 'block';
+    contextMenu.style.left = event.pageX + 'px';
+    contextMenu.style.top = event.pageY + 'px';
+}
+
+function hideContextMenu() {
+    document.getElementById('contextMenu').style.display = 'none';
+}
+
+async function renameSelectedDrawing() {
+    hideContextMenu();
+
+    const drawingSelect = document.getElementById('drawingSelect');
+    const drawingId = parseInt(drawingSelect.value);
+    if (!drawingId) return;
+
+    const drawing = allDrawings.find(d => d.id === drawingId);
+    if (!drawing) return;
+
+    const newName = prompt('Enter new drawing name:', drawing.name);
+    if (!newName || newName === drawing.name) return;
+
+    await fetch(`/api/drawings/${drawingId}`, {
+        method: 'PUT',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ name: newName })
+    });
+
+    await selectProject(currentProject.id);
+}
+
+async function deleteSelectedDrawing() {
+    hideContextMenu();
+
+    const drawingSelect = document.getElementById('drawingSelect');
+    const drawingId = parseInt(drawingSelect.value);
+    if (!drawingId) return;
+
+    if (!confirm('Delete this drawing? All detected items will be permanently deleted!')) return;
+
+    await fetch(`/api/drawings/${drawingId}`, { method: 'DELETE' });
+
+    if (currentDrawing === drawingId) {
+        currentDrawing = null;
+        currentImage = null;
+        document.getElementById('canvasInstructions').style.display = 'block';
+        canvas.style.display = 'none';
+    }
+
+    await selectProject(currentProject.id);
+}
+
+// Canvas and drawing functions
+function handleDrawingChange() {
+    const drawingSelect = document.getElementById('drawingSelect');
+    const drawingId = parseInt(drawingSelect.value);
+    if (drawingId) selectDrawing(drawingId);
+}
+
+async function selectDrawing(drawingId) {
+    console.log('=== Selecting Drawing:', drawingId, '===');
+    currentDrawing = drawingId;
+    currentPage = 0; // Always start at page 0
+
+    // Drawing image, scales for this drawing/page and takeoff data
+    // are independent, so load them concurrently
+    await Promise.all([loadDrawingPage(), loadScales(), loadTakeoff()]);
+
+    console.log('=== Drawing Selection Complete ===');
+}
+
+// Recently viewed page images as blob object URLs, so going back to a
+// page skips the download (Map order doubles as LRU order)
+const PAGE_IMAGE_CACHE_SIZE = 8;
+const pageImageCache = new Map();
+
+async function getPageImageURL(drawingId, page) {
+    const key = `${drawingId}:${page}`;
+    let url = pageImageCache.get(key);
+    if (!url) {
+        const response = await fetch(`/api/drawings/${drawingId}/page/${page}/image`, {
+            headers: { 'Accept': 'image/webp,image/*;q=0.8' }
+        });
+        if (!response.ok) return null;
+        const blob = await response.blob();
+
+        // Another load may have cached this page while we waited
+        url = pageImageCache.get(key) || URL.createObjectURL(blob);
+    }
+
+    pageImageCache.delete(key);
+    pageImageCache.set(key, url);
+    if (pageImageCache.size > PAGE_IMAGE_CACHE_SIZE) {
+        const [oldestKey, oldestURL] = pageImageCache.entries().next().value;
+        pageImageCache.delete(oldestKey);
+        URL.revokeObjectURL(oldestURL);
+    }
+    return url;
+}
+
+async function loadDrawingPage() {
+    const token = ++pageLoadToken;
+
+    // Stop decoding the image of a page we've already left
+    if (pendingImage) {
+        pendingImage.onload = null;
+        pendingImage.src = '';
+        pendingImage = null;
+    }
+
+    const url = await getPageImageURL(currentDrawing, currentPage);
+    if (!url || token !== pageLoadToken) return;
+
+    const img = pendingImage = new Image();
+    img.onload = function() {
+        pendingImage = null;
+        currentImage = img;
+        canvas.width = img.width;
+        canvas.height = img.height;
+        zoomLevel = 1.0;
+        panX = 0;
+        panY = 0;
+        redrawCanvas();
+        document.getElementById('canvasInstructions').style.display = 'none';
+        canvas.style.display = 'block';
+        loadDetectedItems();
+    };
+    img.src = url;
+}
+
+// Decode the packed item list (ITEM_RECORD in routes/drawings.py)
+const ITEM_RECORD_SIZE = 15;
+const utf8 = new TextDecoder();
+
+function unpackItems(buffer) {
+    const view = new DataView(buffer);
+    let offset = 0;
+
+    const types = [];
+    const typeCount = view.getUint16(offset, true);
+    offset += 2;
+    for (let i = 0; i < typeCount; i++) {
+        const length = view.getUint16(offset, true);
+        types.push(utf8.decode(new Uint8Array(buffer, offset + 2, length)));
+        offset += 2 + length;
+    }
+
+    const items = [];
+    for (; offset + ITEM_RECORD_SIZE <= buffer.byteLength; offset += ITEM_RECORD_SIZE) {
+        items.push({
+            id: view.getUint32(offset, true),
+            item_type: types[view.getUint16(offset + 4, true)],
+            x: view.getInt16(offset + 6, true),
+            y: view.getInt16(offset + 8, true),
+            width: view.getInt16(offset + 10, true),
+            height: view.getInt16(offset + 12, true),
+            verified: view.getUint8(offset + 14) === 1
+        });
+    }
+    return items;
+}
+
+async function loadDetectedItems() {
+    const token = pageLoadToken;
+    const response = await fetch(`/api/drawings/${currentDrawing}/items?page=${currentPage}&format=bin`);
+    const items = unpackItems(await response.arrayBuffer());
+    if (token !== pageLoadToken) return;
+
+    currentDetectedItems = items;
+    refreshItemOverlay();
+    updateDetectionInfo();
+}
+
+// Redraws are coalesced to at most one per animation frame, however many
+// mouse moves, wheel events or loads ask for one in between
+function redrawCanvas() {
+    fullRedraw = true;
+    queueDraw();
+}
+
+// Repaint only around detected items that were added, removed or changed
+// since the last paint (the image, zones and transform are unchanged)
+function refreshItemOverlay() {
+    const current = new Map(currentDetectedItems.map(item => [item.id, item]));
+    for (const [id, item] of current) {
+        const drawn = drawnItems.get(id);
+        if (!drawn || drawn.x !== item.x || drawn.y !== item.y || drawn.width !== item.width ||
+                drawn.height !== item.height || drawn.verified !== item.verified ||
+                drawn.item_type !== item.item_type) {
+            if (drawn) dirtyRegions.push(itemRegion(drawn));
+            dirtyRegions.push(itemRegion(item));
+        }
+    }
+    for (const [id, drawn] of drawnItems) {
+        if (!current.has(id)) dirtyRegions.push(itemRegion(drawn));
+    }
+    if (dirtyRegions.length) queueDraw();
+}
+
+// Image-space area an item's box and label cover at the current zoom
+function itemRegion(item) {
+    const k = DETECTION_TO_DISPLAY;
+    ctx.font = `${12 / zoomLevel}px Arial`;
+    const pad = 2 / zoomLevel;
+    const labelHeight = 17 / zoomLevel;
+    const labelWidth = ctx.measureText(item.item_type).width;
+    return {
+        x: item.x * k - pad,
+        y: item.y * k - labelHeight - pad,
+        width: Math.max(item.width * k, labelWidth) + 2 * pad,
+        height: item.height * k + labelHeight + 2 * pad
+    };
+}
+
+function queueDraw() {
+    if (redrawQueued) return;
+    redrawQueued = true;
+    requestAnimationFrame(() => {
+        redrawQueued = false;
+        const regions = fullRedraw ? null : dirtyRegions;
+        fullRedraw = false;
+        dirtyRegions = [];
+        drawCanvas(regions);
+    });
+}
+
+// Paint the page, zones and items - everywhere, or clipped to `regions`
+function drawCanvas(regions = null) {
+    if (!currentImage) return;
+
+    ctx.setTransform(1, 0, 0, 1, 0, 0);
+    if (!regions) ctx.clearRect(0, 0, canvas.width, canvas.height);
+    ctx.translate(panX, panY);
+    ctx.scale(zoomLevel, zoomLevel);
+    if (regions) {
+        ctx.save();
+        ctx.beginPath();
+        regions.forEach(r => ctx.rect(r.x, r.y, r.width, r.height));
+        ctx.clip();
+        regions.forEach(r => ctx.clearRect(r.x, r.y, r.width, r.height));
+    }
+    ctx.drawImage(currentImage, 0, 0);
+
+    // Draw scale zones
+    scaleZones.forEach(zone => {
+        ctx.strokeStyle = '#3498db';
+        ctx.lineWidth = 2 / zoomLevel;
+        ctx.setLineDash([10 / zoomLevel, 5 / zoomLevel]);
+        ctx.strokeRect(zone.x, zone.y, zone.width, zone.height);
+        ctx.setLineDash([]);
+        ctx.fillStyle = 'rgba(52, 152, 219, 0.1)';
+        ctx.fillRect(zone.x, zone.y, zone.width, zone.height);
+
+        // Draw zone label with name and scale
+        ctx.fillStyle = '#3498db';
+        ctx.font = `bold ${12 / zoomLevel}px Arial`;
+        ctx.fillText(zone.name, zone.x + 5 / zoomLevel, zone.y + 15 / zoomLevel);
+
+        if (zone.scale_name) {
+            ctx.font = `${10 / zoomLevel}px Arial`;
+            ctx.fillText(zone.scale_name, zone.x + 5 / zoomLevel, zone.y + 28 / zoomLevel);
+        }
+    });
+
+    // Draw current zone being drawn
+    if (currentZoneRect && currentZoneRect.width && currentZoneRect.height) {
+        ctx.strokeStyle = '#e74c3c';
+        ctx.lineWidth = 2 / zoomLevel;
+        ctx.setLineDash([5 / zoomLevel]);
+        ctx.strokeRect(zoneStartX, zoneStartY, currentZoneRect.width, currentZoneRect.height);
+        ctx.setLineDash([]);
+    }
+
+    // Draw detected items - one path and one style change per
+    // verified state instead of per item
+    const verified = [];
+    const unverified = [];
+    currentDetectedItems.forEach(item => (item.verified ? verified : unverified).push(item));
+
+    ctx.lineWidth = 2 / zoomLevel;
+    ctx.font = `${12 / zoomLevel}px Arial`;
+    drawItemBatch(unverified, '#e74c3c');
+    drawItemBatch(verified, '#2ecc71');
+
+    if (regions) ctx.restore();
+    drawnItems = new Map(currentDetectedItems.map(item => [item.id, item]));
+}
+
+// Detected items are in detection-render pixels; the canvas shows the
+// lower-DPI display render
+const DETECTION_TO_DISPLAY = canvas.dataset.displayDpi / canvas.dataset.detectionDpi;
+
+function drawItemBatch(items, color) {
+    if (items.length === 0) return;
+
+    const k = DETECTION_TO_DISPLAY;
+    ctx.strokeStyle = color;
+    ctx.beginPath();
+    items.forEach(item => ctx.rect(item.x * k, item.y * k, item.width * k, item.height * k));
+    ctx.stroke();
+
+    ctx.fillStyle = color;
+    const labelOffset = 5 / zoomLevel;
+    items.forEach(item => ctx.fillText(item.item_type, item.x * k, item.y * k - labelOffset));
+}
+
+function updateDetectionInfo() {
+    const scaleName = currentPageScale?.scale_name || 'Not set';
+    document.getElementById('detectionInfo').innerHTML = `
+        <p style="font-size: 13px;">Scale: ${scaleName}</p>
+        <p style="font-size: 13px;">Items: ${currentDetectedItems.length}</p>
+        <p style="font-size: 13px;">Zones: ${scaleZones.length}</p>
+        <p style="font-size: 13px;">Zoom: ${Math.round(zoomLevel * 100)}%</p>
+    `;
+}
+
+function handleMouseDown(event) {
+    if (isDrawingZone && event.button === 0) {
+        const rect = canvas.getBoundingClientRect();
+        const scaleX = canvas.width / rect.width;
+        const scaleY = canvas.height / rect.height;
+        const canvasX = (event.clientX - rect.left) * scaleX;
+        const canvasY = (event.clientY - rect.top) * scaleY;
+        zoneStartX = (canvasX - panX) / zoomLevel;
+        zoneStartY = (canvasY - panY) / zoomLevel;
+        currentZoneRect = { startX: zoneStartX, startY: zoneStartY };
+    } else if (event.button === 1) {
+        event.preventDefault();
+        isPanning = true;
+        const rect = canvas.getBoundingClientRect();
+        const scaleX = canvas.width / rect.width;
+        const scaleY = canvas.height / rect.height;
+        lastMouseX = (event.clientX - rect.left) * scaleX;
+        lastMouseY = (event.clientY - rect.top) * scaleY;
+        canvas.style.cursor = 'grabbing';
+    }
+}
+
+function handleMouseMove(event) {
+    if (isDrawingZone && currentZoneRect) {
+        const rect = canvas.getBoundingClientRect();
+        const scaleX = canvas.width / rect.width;
+        const scaleY = canvas.height / rect.height;
+        const canvasX = (event.clientX - rect.left) * scaleX;
+        const canvasY = (event.clientY - rect.top) * scaleY;
+        const currentX = (canvasX - panX) / zoomLevel;
+        const currentY = (canvasY - panY) / zoomLevel;
+        currentZoneRect.width = currentX - zoneStartX;
+        currentZoneRect.height = currentY - zoneStartY;
+        redrawCanvas();
+    } else if (isPanning && currentImage) {
+        const rect = canvas.getBoundingClientRect();
+        const scaleX = canvas.width / rect.width;
+        const scaleY = canvas.height / rect.height;
+        const currentMouseX = (event.clientX - rect.left) * scaleX;
+        const currentMouseY = (event.clientY - rect.top) * scaleY;
+        panX += currentMouseX - lastMouseX;
+        panY += currentMouseY - lastMouseY;
+        lastMouseX = currentMouseX;
+        lastMouseY = currentMouseY;
+        redrawCanvas();
+    }
+}
+
+async function handleMouseUp(event) {
+    if (isDrawingZone && currentZoneRect && event.button === 0) {
+        // Prevent double creation
+        if (isCreatingZone) {
+            console.log('Zone creation already in progress, ignoring');
+            return;
+        }
+
+        const width = Math.abs(currentZoneRect.width);
+        const height = Math.abs(currentZoneRect.height);
+
+        if (width > 10 && height > 10) {
+            const x = currentZoneRect.width < 0 ? zoneStartX + currentZoneRect.width : zoneStartX;
+            const y = currentZoneRect.height < 0 ? zoneStartY + currentZoneRect.height : zoneStartY;
+
+            // Store pending zone coordinates
+            pendingZone = { x, y, width, height };
+
+            // Show create zone modal
+            showCreateZoneModal();
+        } else {
+            console.log('Zone too small, ignoring');
+        }
+
+        currentZoneRect = null;
+        redrawCanvas();
+    } else if (event.button === 1 || isPanning) {
+        isPanning = false;
+        canvas.style.cursor = isDrawingZone ? 'crosshair' : 'default';
+    }
+}
+
+function showCreateZoneModal() {
+    // Populate zone name with default
+    document.getElementById('zoneNameInput').value = `Zone ${scaleZones.length + 1}`;
+
+    // Populate scale dropdown
+    const zoneScaleSelect = document.getElementById('zoneScaleSelect');
+    zoneScaleSelect.innerHTML = '<option value="inherit">Inherit from Page Scale' + 
+        (currentPageScale ? ` (${currentPageScale.scale_name})` : ' (None set)') + 
+        '</option>';
+
+    // Add architectural scales
+    const archGroup = document.createElement('optgroup');
+    archGroup.label = 'Architectural';
+    commonScales.filter(s => s.type === 'architectural').forEach(scale => {
+        const option = document.createElement('option');
+        option.value = scale.id;
+        option.textContent = scale.name;
+        archGroup.appendChild(option);
+    });
+    zoneScaleSelect.appendChild(archGroup);
+
+    // Add engineering scales
+    const engGroup = document.createElement('optgroup');
+    engGroup.label = 'Engineering';
+    commonScales.filter(s => s.type === 'engineering').forEach(scale => {
+        const option = document.createElement('option');
+        option.value = scale.id;
+        option.textContent = scale.name;
+        engGroup.appendChild(option);
+    });
+    zoneScaleSelect.appendChild(engGroup);
+
+    // Add metric scales
+    const metricGroup = document.createElement('optgroup');
+    metricGroup.label = 'Metric';
+    commonScales.filter(s => s.type === 'metric').forEach(scale => {
+        const option = document.createElement('option');
+        option.value = scale.id;
+        option.textContent = scale.name;
+        metricGroup.appendChild(option);
+    });
+    zoneScaleSelect.appendChild(metricGroup);
+
+    // Add custom scales
+    if (customScales.length > 0) {
+        const customGroup = document.createElement('optgroup');
+        customGroup.label = 'Custom Scales';
+        customScales.forEach(scale => {
+            const option = document.createElement('option');
+            option.value = `custom_${scale.id}`;
+            option.textContent = scale.name;
+            customGroup.appendChild(option);
+        });
+        zoneScaleSelect.appendChild(customGroup);
+    }
+
+    // Show modal
+    document.getElementById('createZoneModal').style.display = 'block';
+}
+
+async function confirmCreateZone() {
+    if (isCreatingZone) {
+        console.log('Zone creation already in progress');
+        return;
+    }
+
+    if (!pendingZone) {
+        console.log('No pending zone');
+        return;
+    }
+
+    isCreatingZone = true;
+
+    const zoneName = document.getElementById('zoneNameInput').value.trim();
+    const selectedScale = document.getElementById('zoneScaleSelect').value;
+
+    if (!zoneName) {
+        alert('Please enter a zone name');
+        isCreatingZone = false;
+        return;
+    }
+
+    let zoneScaleId = null;
+    let zoneScaleName = null;
+    let zonePixelsPerUnit = null;
+
+    // Determine scale for zone
+    if (selectedScale === 'inherit') {
+        // Inherit from page scale
+        if (currentPageScale) {
+            zoneScaleId = currentPageScale.scale_id;
+            zoneScaleName = currentPageScale.scale_name;
+            zonePixelsPerUnit = currentPageScale.pixels_per_unit;
+        }
+    } else {
+        // Use selected scale
+        if (selectedScale.startsWith('custom_')) {
+            const customId = parseInt(selectedScale.replace('custom_', ''));
+            const custom = customScales.find(s => s.id === customId);
+            if (custom) {
+                zoneScaleId = selectedScale;
+                zoneScaleName = custom.name;
+                zonePixelsPerUnit = custom.pixels_per_unit;
+            }
+        } else {
+            const common = commonScales.find(s => s.id === selectedScale);
+            if (common) {
+                zoneScaleId = selectedScale;
+                zoneScaleName = common.name;
+            }
+        }
+    }
+
+    try {
+        console.log('Creating zone:', zoneName, 'with scale:', zoneScaleName);
+
+        const response = await fetch(`/api/drawings/${currentDrawing}/page/${currentPage}/scale-zones`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                name: zoneName,
+                x: pendingZone.x,
+                y: pendingZone.y,
+                width: pendingZone.width,
+                height: pendingZone.height,
+                scale_id: zoneScaleId,
+                scale_name: zoneScaleName,
+                pixels_per_unit: zonePixelsPerUnit
+            })
+        });
+
+        if (!response.ok) {
+            throw new Error('Failed to create zone');
+        }
+
+        await loadScaleZones();
+        closeModals();
+        showSuccessToast(`✓ Zone "${zoneName}" created`);
+    } catch (error) {
+        console.error('Error creating zone:', error);
+        alert('Error creating zone: ' + error.message);
+    } finally {
+        pendingZone = null;
+        isCreatingZone = false;
+    }
+}
+
+function cancelCreateZone() {
+    pendingZone = null;
+    isCreatingZone = false;
+    closeModals();
+}
+
+function handleZoom(event) {
+    event.preventDefault();
+    if (!currentImage) return;
+
+    const rect = canvas.getBoundingClientRect();
+    const scaleX = canvas.width / rect.width;
+    const scaleY = canvas.height / rect.height;
+    const canvasX = (event.clientX - rect.left) * scaleX;
+    const canvasY = (event.clientY - rect.top) * scaleY;
+    const pointX = (canvasX - panX) / zoomLevel;
+    const pointY = (canvasY - panY) / zoomLevel;
+    const zoomDelta = event.deltaY > 0 ? 0.9 : 1.1;
+    const newZoom = Math.min(Math.max(0.1, zoomLevel * zoomDelta), 10);
+    panX = canvasX - pointX * newZoom;
+    panY = canvasY - pointY * newZoom;
+    zoomLevel = newZoom;
+    redrawCanvas();
+    updateDetectionInfo();
+}
+
+function resetZoom() {
+    if (!currentImage) return;
+    zoomLevel = 1.0;
+    panX = 0;
+    panY = 0;
+    redrawCanvas();
+    updateDetectionInfo();
+}
+
+function handleKeyboard(event) {
+    if (!currentImage) return;
+    if (event.target.tagName === 'INPUT' || event.target.tagName === 'TEXTAREA' || event.target.tagName === 'SELECT') return;
+
+    if (event.key === 'r' || event.key === 'R') {
+        event.preventDefault();
+        resetZoom();
+    }
+}
+
+async function loadTakeoff() {
+    const response = await fetch(`/api/drawings/${currentDrawing}/takeoff-by-wbs`);
+    const takeoff = await response.json();
+
+    const summaryDiv = document.getElementById('takeoffSummary');
+    if (takeoff.length === 0) {
+        summaryDiv.innerHTML = '<p style="color: #95a5a6; font-size: 13px;">No items</p>';
+        return;
+    }
+
+    renderHTML(summaryDiv, takeoff.map(wbs => `
+        <div class="wbs-group">
+            <div class="wbs-group-header">${wbs.wbs_category}</div>
+            <div class="wbs-group-items">
+                ${wbs.items.map(item => `
+                    <div class="item-count">
+                        <span>${item.item_type}</span>
+                        <strong>${item.count}</strong>
+                    </div>
+                `).join('')}
+            </div>
+        </div>
+    `).join(''));
+}
+
+async function processCurrentDrawing() {
+    if (!currentDrawing) {
+        alert('Select a drawing first');
+        return;
+    }
+
+    const response = await fetch(`/api/drawings/${currentDrawing}/process`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ page_number: currentPage })
+    });
+
+    const result = await response.json();
+    alert(`Detected ${result.count} items!`);
+    await loadDetectedItems();
+    await loadTakeoff();
+}
+
+function uploadDrawing() {
+    if (!currentProject) {
+        alert('Select a project first');
+        return;
+    }
+    document.getElementById('fileInput').click();
+}
+
+async function handleFileUpload(event) {
+    const files = event.target.files;
+    if (!files || files.length === 0) return;
+
+    for (let file of files) {
+        const formData = new FormData();
+        formData.append('file', file);
+        await fetch(`/api/projects/${currentProject.id}/drawings`, {
+            method: 'POST',
+            body: formData
+        });
+    }
+
+    await selectProject(currentProject.id);
+    alert('Drawings uploaded!');
+    event.target.value = '';
+}
+
+function showNewProjectModal() {
+    document.getElementById('newProjectModal').style.display = 'block';
+}
+
+async function createProject() {
+    const name = document.getElementById('projectName').value.trim();
+    const description = document.getElementById('projectDescription').value.trim();
+
+    if (!name) {
+        alert('Enter a project name');
+        return;
+    }
+
+    await fetch('/api/projects', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ name, description })
+    });
+
+    closeModals();
+    await loadProjects();
+}
+
+function showManageWBSModal() {
+    if (!currentProject) {
+        alert('Select a project first');
+        return;
+    }
+    document.getElementById('manageWBSModal').style.display = 'block';
+    renderWBSList();
+}
+
+function renderWBSList() {
+    const list = document.getElementById('wbsList');
+    const parentSelect = document.getElementById('newWBSParent');
+
+    if (wbsCategories.length === 0) {
+        list.innerHTML = '<p style="color: #95a5a6;">No categories</p>';
+        parentSelect.innerHTML = '<option value="">Top Level</option>';
+        return;
+    }
+
+    parentSelect.innerHTML = '<option value="">Top Level</option>';
+    wbsCategories.forEach(c => {
+        const option = document.createElement('option');
+        option.value = c.id;
+        option.textContent = c.name;
+        parentSelect.appendChild(option);
+    });
+
+    function renderCategory(cat, level = 0) {
+        const indent = '\u00A0\u00A0'.repeat(level * 2);
+        const prefix = level > 0 ? '└ ' : '';
+        const html = `
+            <div class="wbs-list-item ${level > 0 ? 'level-1' : ''} ${cat.id === currentWBSCategory ? 'selected' : ''}">
+                <span>${indent}${prefix}${cat.name}</span>
+                <button class="small danger" onclick="deleteWBSCategory(${cat.id})">Delete</button>
+            </div>
+        `;
+
+        let childrenHtml = '';
+        const children = wbsCategories.filter(c => c.parent_id === cat.id);
+        children.forEach(child => {
+            childrenHtml += renderCategory(child, level + 1);
+        });
+
+        return html + childrenHtml;
+    }
+
+    const topLevel = wbsCategories.filter(c => c.parent_id === null);
+    list.innerHTML = topLevel.map(cat => renderCategory(cat)).join('');
+}
+
+async function addWBSCategory() {
+    const name = document.getElementById('newWBSName').value.trim();
+    const parentId = document.getElementById('newWBSParent').value;
+
+    if (!name) {
+        alert('Enter a category name');
+        return;
+    }
+
+    await fetch(`/api/projects/${currentProject.id}/wbs`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ name, parent_id: parentId || null })
+    });
+
+    document.getElementById('newWBSName').value = '';
+    await loadWBSCategories();
+    renderWBSList();
+}
+
+async function deleteWBSCategory(categoryId) {
+    if (!confirm('Delete this category?')) return;
+
+    const response = await fetch(`/api/wbs/${categoryId}`, { method: 'DELETE' });
+    if (!response.ok) {
+        const data = await response.json();
+        alert(data.error);
+        return;
+    }
+
+    await loadWBSCategories();
+    renderWBSList();
+    await loadTakeoff();
+}
+
+async function exportTakeoff() {
+    if (!currentDrawing) {
+        alert('Select a drawing first');
+        return;
+    }
+
+    const response = await fetch(`/api/drawings/${currentDrawing}/takeoff-by-wbs`);
+    const takeoff = await response.json();
+
+    // One Blob part per row - the Blob joins them, no growing string
+    const rows = ['WBS Category,Item Type,Count\n'];
+    takeoff.forEach(wbs => {
+        wbs.items.forEach(item => {
+            rows.push(`${wbs.wbs_category},${item.item_type},${item.count}\n`);
+        });
+    });
+
+    const blob = new Blob(rows, { type: 'text/csv' });
+    const url = window.URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.href = url;
+    a.download = 'takeoff.csv';
+    a.click();
+    setTimeout(() => window.URL.revokeObjectURL(url), 0);
+}
+
+function showSuccessToast(message) {
+    const toast = document.createElement('div');
+    toast.className = 'success-toast';
+    toast.textContent = message;
+    document.body.appendChild(toast);
+    setTimeout(() => toast.remove(), 3000);
+}
+
+function closeModals() {
+    document.getElementById('newProjectModal').style.display = 'none';
+    document.getElementById('manageWBSModal').style.display = 'none';
+    document.getElementById('calibrateModal').style.display = 'none';
+    document.getElementById('scaleZonesModal').style.display = 'none';
+    document.getElementById('createZoneModal').style.display = 'none';
+    document.getElementById('projectName').value = '';
+    document.getElementById('projectDescription').value = '';
+
+    // Clean up zone creation state
+    if (pendingZone) {
+        pendingZone = null;
+        isCreatingZone = false;
+    }
+}
+
+function changeCompany() {
+    if (confirm('Change company? Unsaved work will be lost.')) {
+        window.location.href = '/';
+    }
+}
+
+async function logout() {
+    if (confirm('Logout?')) {
+        await fetch('/api/auth/logout', { method: 'POST' });
+        window.location.href = '/';
+    }
+}
@@ -0,0 +1,12 @@
+"""
+WSGI entry point
+Run with: gunicorn -c gunicorn.conf.py wsgi:application
+Initialize the database first with: flask --app app init-db
+"""
+import os
+
+os.environ.setdefault('FLASK_ENV', 'production')
+
+from app import create_app
+
+application = create_app()
\ No newline at end of file